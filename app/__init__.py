@@ -2,9 +2,11 @@
 import os
 from flask import Flask
 from flask_login import LoginManager
+from sqlalchemy.engine import make_url
 
 from app.config import Config
 from app.models import db, User
+from app.utils import perf, sqlite_profile
 
 def create_app(config_class=Config):
     app = Flask(__name__)
@@ -13,7 +15,6 @@ def create_app(config_class=Config):
     # === FORCE CREATE SQLITE DIR ===
 
     database_url = os.environ.get("DATABASE_URL")
-    print(f"Database URL: {database_url}")
 
     if database_url:
         # Render postgres fix
@@ -27,9 +28,16 @@ def create_app(config_class=Config):
         db_path = app.config["SQLALCHEMY_DATABASE_URI"].replace("sqlite:///", "")
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_pre_ping": True
-    }
+    tune_sqlite = app.config["SQLITE_TUNING"] and sqlite_profile.is_sqlite_file(app.config["SQLALCHEMY_DATABASE_URI"])
+    if tune_sqlite:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = sqlite_profile.engine_options(app.config)
+    else:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "pool_pre_ping": True
+        }
+    app.logger.info(
+        "Database: %s", make_url(app.config["SQLALCHEMY_DATABASE_URI"]).render_as_string(hide_password=True)
+    )
 
 
     # Upload folders
@@ -37,6 +45,10 @@ def create_app(config_class=Config):
     os.makedirs(app.config["GALLERY_UPLOAD_FOLDER"], exist_ok=True)
 
     db.init_app(app)
+    with app.app_context():
+        if tune_sqlite:
+            sqlite_profile.install(db.engine, app.config)
+        perf.init_app(app, db.engine)
 
     login_manager = LoginManager(app)
     login_manager.login_view = "admin.login"
@@ -51,11 +63,34 @@ def create_app(config_class=Config):
         from app.services.auth_service import ensure_admin_exists
         ensure_admin_exists()
 
+        # Creating the index locks whole tables, so it is left to `goslides search-index`
+        from app.services.search_service import missing_search_indexes
+        try:
+            missing = missing_search_indexes()
+        except Exception:
+            app.logger.exception("Could not check the search index")
+        else:
+            if missing:
+                app.logger.warning(
+                    "Full-text search index missing for %s; run `flask --app run goslides search-index`",
+                    ", ".join(missing),
+                )
+
+        # Start with an empty pool, so workers forked after this (gunicorn --preload) never
+        # share the startup connections (an in-memory database would not survive it)
+        if not sqlite_profile.is_memory(db.engine.url):
+            db.engine.dispose()
+
     from app.routes.public import public_bp
     from app.routes.admin import admin_bp
+    from app.routes.api import api_bp
 
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp, url_prefix="/admin")
+    app.register_blueprint(api_bp, url_prefix="/api")
+
+    from app.cli import goslides_cli
+    app.cli.add_command(goslides_cli)
 
     return app
 
@@ -0,0 +1,184 @@
+"""Maintenance commands: `flask --app run goslides <command>`."""
+import time
+
+import click
+from flask.cli import AppGroup
+
+goslides_cli = AppGroup("goslides", help="Go Slides maintenance commands.")
+
+
+@goslides_cli.command("reconcile-counters")
+def reconcile_counters():
+    """Repair drift in the per-activity registrant counters."""
+    from app.services.activity_service import reconcile_activity_counters
+
+    repaired = reconcile_activity_counters()
+    if repaired:
+        click.echo(f"Repaired counters for {len(repaired)} activities: {', '.join(map(str, repaired))}")
+    else:
+        click.echo("All activity counters are in sync.")
+
+
+@goslides_cli.command("rebuild-daily-stats")
+def rebuild_daily_stats_command():
+    """Recompute the registration_daily_stats rollup from registrants."""
+    from app.services.dashboard_service import rebuild_daily_stats
+
+    rows = rebuild_daily_stats()
+    click.echo(f"Rebuilt {rows} daily stat rows.")
+
+
+@goslides_cli.command("send-notifications")
+@click.option("--batch", default=50, show_default=True, help="Messages claimed per batch.")
+@click.option("--interval", default=2.0, show_default=True, help="Seconds to sleep when nothing is due.")
+@click.option("--once", is_flag=True, help="Exit once the outbox has nothing due.")
+def send_notifications(batch, interval, once):
+    """Deliver queued WhatsApp messages with retries and backoff, and send broadcasts."""
+    from app.services.notification_service import run_outbox_worker
+
+    run_outbox_worker(batch_size=batch, interval=interval, once=once, echo=click.echo)
+
+
+@goslides_cli.command("run-broadcasts")
+def run_broadcasts():
+    """Send queued broadcasts and resume ones abandoned by a restarted process."""
+    from app.services.broadcast_service import resume_broadcasts
+
+    resumed = resume_broadcasts()
+    click.echo(f"Finished {len(resumed)} broadcast(s).")
+
+
+def _rate(count, elapsed, unit):
+    return f"{count} {unit} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} {unit}/s)"
+
+
+@goslides_cli.command("backfill-codes")
+@click.option("--batch", default=500, show_default=True, help="Registrants updated per transaction.")
+def backfill_codes(batch):
+    """Give every registrant without a check-in code a unique one."""
+    from app.services.registrant_service import backfill_check_in_codes
+
+    started = time.perf_counter()
+    updated = backfill_check_in_codes(batch_size=batch)
+    click.echo(f"Backfilled {_rate(updated, time.perf_counter() - started, 'codes')}.")
+
+
+@goslides_cli.command("indexes")
+@click.option("--reindex", is_flag=True, help="Also rebuild the indexes that already exist.")
+def indexes(reindex):
+    """Create missing schema.sql indexes and verify the columns of existing ones."""
+    from app.services.maintenance_service import ensure_indexes
+
+    started = time.perf_counter()
+    result = ensure_indexes(reindex=reindex)
+    elapsed = time.perf_counter() - started
+    for label in ("created", "ok", "mismatched", "skipped"):
+        if result[label]:
+            click.echo(f"{label}: {', '.join(result[label])}")
+    checked = sum(len(names) for names in result.values())
+    click.echo(f"Checked {_rate(checked, elapsed, 'indexes')}.")
+    if result["mismatched"]:
+        raise click.ClickException("Some indexes differ from schema.sql; drop them and run this command again.")
+
+
+@goslides_cli.command("vacuum")
+def vacuum():
+    """Run ANALYZE and VACUUM (SQLite) or VACUUM ANALYZE (Postgres)."""
+    from app.services.maintenance_service import database_size, vacuum_analyze
+
+    before = database_size()
+    started = time.perf_counter()
+    vacuum_analyze()
+    elapsed = time.perf_counter() - started
+    after = database_size()
+    if before is None:
+        click.echo(f"Vacuumed in {elapsed:.2f}s.")
+        return
+    mib = 1024 * 1024
+    click.echo(
+        f"Vacuumed {before / mib:.1f} MiB -> {after / mib:.1f} MiB in {elapsed:.2f}s "
+        f"({before / mib / elapsed if elapsed else 0:.1f} MiB/s)."
+    )
+
+
+@goslides_cli.command("integrity")
+@click.option("--remove-orphans", is_flag=True, help="Delete upload files that no row refers to.")
+def integrity(remove_orphans):
+    """Report gallery/sponsor rows with missing files and files with no row."""
+    from app.services.maintenance_service import check_upload_integrity
+
+    started = time.perf_counter()
+    report = check_upload_integrity(remove_orphans=remove_orphans)
+    elapsed = time.perf_counter() - started
+    problems = 0
+    for kind, result in report.items():
+        click.echo(f"{kind}: {result['rows']} rows, {result['files']} files")
+        for name in result["missing"]:
+            click.echo(f"  missing file: {name}")
+        for name in result["orphans"]:
+            click.echo(f"  {'removed' if remove_orphans else 'orphan'}: {name}")
+        problems += len(result["missing"]) + (0 if remove_orphans else len(result["orphans"]))
+    scanned = sum(result["rows"] + result["files"] for result in report.values())
+    click.echo(f"Scanned {_rate(scanned, elapsed, 'rows+files')}.")
+    if problems:
+        raise click.ClickException(f"{problems} integrity problem(s) found.")
+
+
+@goslides_cli.command("prune-logs")
+@click.option("--days", type=int, default=None, help="Keep this many days (default AUDIT_LOG_RETENTION_DAYS).")
+@click.option("--archive", type=click.Path(dir_okay=False), default=None, help="Append removed entries to this .jsonl.gz file first.")
+def prune_logs_command(days, archive):
+    """Delete (and optionally archive) activity log entries past the retention period."""
+    from flask import current_app
+    from app.services.activity_log_service import prune_logs
+
+    days = days if days is not None else current_app.config["AUDIT_LOG_RETENTION_DAYS"]
+    started = time.perf_counter()
+    removed = prune_logs(days, archive_path=archive)
+    click.echo(f"Removed {_rate(removed, time.perf_counter() - started, 'entries')} older than {days} days.")
+    if archive and removed:
+        click.echo(f"Archived to {archive}")
+
+
+@goslides_cli.command("search-index")
+@click.option("--rebuild", is_flag=True, help="Refill the SQLite FTS tables from their source tables.")
+def search_index(rebuild):
+    """Create missing full-text search indexes (FTS5 on SQLite, tsvector + GIN on Postgres)."""
+    from app.services.search_service import ensure_search_index
+
+    started = time.perf_counter()
+    kinds = ensure_search_index(rebuild=rebuild)
+    elapsed = time.perf_counter() - started
+    if kinds:
+        click.echo(f"Indexed {', '.join(kinds)} in {elapsed:.2f}s.")
+    else:
+        click.echo("Search indexes are in place.")
+
+
+def _seconds(value):
+    """'90', '30m', '6h' or '1d' as seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    try:
+        if value[-1:].lower() in units:
+            return float(value[:-1]) * units[value[-1].lower()]
+        return float(value)
+    except ValueError:
+        raise click.BadParameter(f"expected e.g. 90, 30m, 6h or 1d, got {value!r}")
+
+
+@goslides_cli.command("backup")
+@click.option("--every", default=None, help="Keep running and take a snapshot at this interval (e.g. 6h, 1d).")
+@click.option("--keep", type=int, default=None, help="Snapshots to keep  [default: BACKUP_KEEP]")
+def backup_command(every, keep):
+    """Write an online snapshot of the database to BACKUP_FOLDER."""
+    from app.services.backup_service import create_backup, run_scheduled
+
+    if every:
+        run_scheduled(_seconds(every), keep=keep, echo=click.echo)
+        return
+    started = time.perf_counter()
+    try:
+        name = create_backup(keep)
+    except Exception as e:
+        raise click.ClickException(f"Backup failed: {e}")
+    click.echo(f"Wrote {name} in {time.perf_counter() - started:.2f}s.")
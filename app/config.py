@@ -29,6 +29,22 @@ class Config:
         "pool_pre_ping": True
     }
 
+    # ================= SQLITE =================
+
+    # Connection profile for the SQLite fallback (SQLITE_TUNING=0 keeps SQLite's defaults)
+    SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "1") == "1"
+    # WAL: readers never block the writer; the database must be on a local disk (not NFS)
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    # NORMAL under WAL fsyncs at checkpoints only; a power cut may lose the last commits, never corrupts
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 10000))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 32768))  # per connection
+    # Per worker process; gunicorn workers each get their own pool
+    SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 4))
+    SQLITE_MAX_OVERFLOW = int(os.environ.get("SQLITE_MAX_OVERFLOW", 4))
+    SQLITE_POOL_TIMEOUT = int(os.environ.get("SQLITE_POOL_TIMEOUT", 30))
+
     # ================= UPLOAD PATHS =================
 
     UPLOAD_FOLDER = BASE_DIR / "app" / "uploads" / "guidelines"
@@ -37,6 +53,72 @@ class Config:
 
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
 
+    # Cache lifetime for uploads whose URL may change content (guideline downloads)
+    UPLOAD_MAX_AGE = int(os.environ.get("UPLOAD_MAX_AGE", 3600))
+    # Hand upload bytes to the front proxy instead of streaming them from a worker:
+    # nginx: UPLOAD_ACCEL_REDIRECT_PREFIX=/_uploads (internal location, see README)
+    # Apache/lighttpd: USE_X_SENDFILE=1
+    UPLOAD_ACCEL_REDIRECT_PREFIX = os.environ.get("UPLOAD_ACCEL_REDIRECT_PREFIX", "")
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "") == "1"
+
+    # ================= CACHING =================
+
+    # Version stamps bumped by write services; every worker checks them per request
+    DATA_VERSION_FOLDER = Path(os.environ.get("DATA_VERSION_FOLDER", BASE_DIR / "instance" / "versions"))
+    # Rendered public pages for anonymous visitors, keyed by URL and data version
+    PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") == "1"
+    PAGE_CACHE_PATH = Path(os.environ.get("PAGE_CACHE_PATH", BASE_DIR / "instance" / "page_cache.db"))
+    PAGE_CACHE_MAX_ROWS = int(os.environ.get("PAGE_CACHE_MAX_ROWS", 1000))
+    # Also bounds how stale a seat count can be: registrations only bump the stamp when they close an activity
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 300))
+    # Active year, About and sponsors held in each worker's memory
+    SITE_CACHE_TTL = int(os.environ.get("SITE_CACHE_TTL", 300))
+
+    # ================= ACTIVITY LOG =================
+
+    # 1 (default) writes each entry in the request that records it. Larger values buffer entries
+    # per process and write them in batches; a worker killed hard (gunicorn timeout SIGKILL, OOM)
+    # loses up to AUDIT_LOG_BATCH entries from the last AUDIT_LOG_FLUSH_SECONDS
+    AUDIT_LOG_BATCH = int(os.environ.get("AUDIT_LOG_BATCH", 1))
+    AUDIT_LOG_FLUSH_SECONDS = float(os.environ.get("AUDIT_LOG_FLUSH_SECONDS", 2))
+    # Default for `flask goslides prune-logs`
+    AUDIT_LOG_RETENTION_DAYS = int(os.environ.get("AUDIT_LOG_RETENTION_DAYS", 365))
+
+    # ================= EXPORTS =================
+
+    # Rendered participant exports, reused until the activity's data_version changes
+    EXPORT_FOLDER = Path(os.environ.get("EXPORT_FOLDER", BASE_DIR / "instance" / "exports"))
+    EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", 2))  # concurrent exports per process
+    EXPORT_JOB_RETENTION_DAYS = int(os.environ.get("EXPORT_JOB_RETENTION_DAYS", 7))
+
+    # ================= PERFORMANCE =================
+
+    # Per-request query/render timing (app/utils/perf.py), shown on /admin/perf
+    PERF_INSTRUMENTATION = os.environ.get("PERF_INSTRUMENTATION", "1") == "1"
+    # Server-Timing header: "staff" (logged-in users), "all" or "off"
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "staff")
+    PERF_HISTORY = int(os.environ.get("PERF_HISTORY", 500))  # recent requests kept per process
+    PERF_N_PLUS_ONE_THRESHOLD = int(os.environ.get("PERF_N_PLUS_ONE_THRESHOLD", 5))  # same statement in one request
+    PERF_SLOW_STATEMENTS = int(os.environ.get("PERF_SLOW_STATEMENTS", 3))
+
+    # ================= BACKUPS =================
+
+    # Snapshots from the admin page and `flask goslides backup`; the newest BACKUP_KEEP are kept
+    BACKUP_FOLDER = Path(os.environ.get("BACKUP_FOLDER", BASE_DIR / "instance" / "backups"))
+    BACKUP_KEEP = int(os.environ.get("BACKUP_KEEP", 14))
+    BACKUP_BATCH_ROWS = int(os.environ.get("BACKUP_BATCH_ROWS", 5000))  # rows fetched per batch (Postgres)
+
+    # ================= CHECK-IN API =================
+
+    # Bearer token for scanner devices posting to /api/checkins (empty = logged-in operators only)
+    CHECKIN_API_TOKEN = os.environ.get("CHECKIN_API_TOKEN", "")
+    CHECKIN_API_MAX_BATCH = int(os.environ.get("CHECKIN_API_MAX_BATCH", 500))
+
+    # ================= QR CODES =================
+
+    QR_CACHE_FOLDER = Path(os.environ.get("QR_CACHE_FOLDER", BASE_DIR / "instance" / "qr_cache"))
+    QR_MEMORY_CACHE_SIZE = int(os.environ.get("QR_MEMORY_CACHE_SIZE", 2048))
+
     ALLOWED_EXTENSIONS = {"pdf"}
     ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
 
@@ -47,3 +129,10 @@ class Config:
     WHATSAPP_ACCOUNT_SID = os.environ.get("WHATSAPP_ACCOUNT_SID", "")
     WHATSAPP_AUTH_TOKEN = os.environ.get("WHATSAPP_AUTH_TOKEN", "")
     WHATSAPP_FROM_NUMBER = os.environ.get("WHATSAPP_FROM_NUMBER", "").replace(" ", "")
+
+    # Outbox delivery (flask goslides send-notifications)
+    # Messages per second for the whole provider account, across every sending process
+    WHATSAPP_RATE_LIMIT = float(os.environ.get("WHATSAPP_RATE_LIMIT", 10))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 6))
+    OUTBOX_BACKOFF_SECONDS = int(os.environ.get("OUTBOX_BACKOFF_SECONDS", 30))
+    BROADCAST_WORKERS = int(os.environ.get("BROADCAST_WORKERS", 8))  # concurrent sends per broadcast
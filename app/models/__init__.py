@@ -1,9 +1,17 @@
 """Database models."""
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.dialects import sqlite
 
 db = SQLAlchemy()
 
+# SQLite stores timestamps as text. CURRENT_TIMESTAMP writes whole seconds while SQLAlchemy binds
+# microseconds, so equal times would not compare equal; use the server's format for keyset columns.
+_SQLITE_SECONDS = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
 
 # Role constants for role-based access
 ROLE_SUPER_ADMIN = "super_admin"
@@ -51,6 +59,12 @@ class Activity(db.Model):
     status = db.Column(db.String(32), nullable=False, default="upcoming")
     quota = db.Column(db.Integer)
     guideline_file = db.Column(db.String(255))
+    # Denormalized registrant counters, maintained by registrant_service
+    registered_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    verified_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    attended_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every change to the activity or its registrants; keys cached export files
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     registrants = db.relationship("Registrant", backref="activity", lazy="dynamic", cascade="all, delete-orphan")
 
@@ -58,7 +72,7 @@ class Activity(db.Model):
     def is_full(self):
         if self.quota is None:
             return False
-        return self.registrants.count() >= self.quota
+        return self.registered_count >= self.quota
 
     @property
     def can_register(self):
@@ -70,6 +84,8 @@ class Activity(db.Model):
 
 class Registrant(db.Model):
     __tablename__ = "registrants"
+    # Serves the admin list's keyset pagination (newest first within an activity)
+    __table_args__ = (db.Index("idx_registrants_activity_created", "activity_id", "created_at", "id"),)
     id = db.Column(db.Integer, primary_key=True)
     activity_id = db.Column(db.Integer, db.ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
     name = db.Column(db.String(255), nullable=False)
@@ -79,12 +95,22 @@ class Registrant(db.Model):
     status = db.Column(db.String(32), nullable=False, default="pending")
     check_in_code = db.Column(db.String(64), unique=True, nullable=True)  # for QR attendance
     attended_at = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    created_at = db.Column(db.DateTime().with_variant(_SQLITE_SECONDS, "sqlite"), server_default=db.func.now())
 
     def __repr__(self):
         return f"<Registrant {self.name}>"
 
 
+class RegistrationDailyStat(db.Model):
+    """Per-activity daily rollup of registrations and check-ins for dashboard charts."""
+    __tablename__ = "registration_daily_stats"
+    activity_id = db.Column(db.Integer, db.ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    registrations = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    attendances = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    activity = db.relationship("Activity", backref=db.backref("daily_stats", lazy="dynamic", cascade="all, delete-orphan"))
+
+
 class Gallery(db.Model):
     __tablename__ = "gallery"
     id = db.Column(db.Integer, primary_key=True)
@@ -93,10 +119,40 @@ class Gallery(db.Model):
     file = db.Column(db.String(255), nullable=False)
     caption = db.Column(db.String(512))
     is_featured = db.Column(db.Boolean, nullable=False, default=False)
+    # Oriented size of the original upload; NULL for uploads made before derivatives existed
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     year = db.relationship("Year", backref=db.backref("gallery_items", lazy="dynamic"))
     activity = db.relationship("Activity", backref=db.backref("gallery_items", lazy="dynamic"))
 
+    # Resized copies written next to the original at upload time: (name, max width)
+    VARIANTS = (("thumb", 320), ("medium", 800), ("full", 1600))
+
+    @staticmethod
+    def variant_name(filename, name, ext):
+        return f"{filename.rsplit('.', 1)[0]}_{name}.{ext}"
+
+    def variant_file(self, name, ext):
+        return self.variant_name(self.file, name, ext)
+
+    @property
+    def variants(self):
+        """(name, pixel width) of the stored derivatives, smallest first; empty for legacy rows."""
+        if not self.width:
+            return []
+        result = []
+        for name, max_width in self.VARIANTS:
+            width = min(max_width, self.width)
+            if not result or result[-1][1] != width:
+                result.append((name, width))
+        return result
+
+    @property
+    def display_file(self):
+        """File to open when the image is clicked: the largest derivative, or the original."""
+        return self.variant_file("full", "jpg") if self.width else self.file
+
 
 class About(db.Model):
     __tablename__ = "about"
@@ -116,6 +172,82 @@ class ContactMessage(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
 
+class NotificationOutbox(db.Model):
+    """Outgoing messages, written with the change that triggers them and sent by `flask goslides send-notifications`."""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (db.Index("idx_notification_outbox_due", "status", "next_attempt_at"),)
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(32), nullable=False, default="whatsapp")
+    recipient = db.Column(db.String(64), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending")  # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+class SendRateLimit(db.Model):
+    """Token bucket per provider account, shared by every process that sends through it."""
+    __tablename__ = "send_rate_limits"
+    name = db.Column(db.String(32), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)  # Unix time of the last refill
+
+
+class Broadcast(db.Model):
+    """A WhatsApp message fanned out to the verified registrants of an activity."""
+    __tablename__ = "broadcasts"
+    id = db.Column(db.Integer, primary_key=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="queued")  # queued, running, done
+    total = db.Column(db.Integer, nullable=False, default=0)
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # refreshed per batch by the process sending it
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    finished_at = db.Column(db.DateTime, nullable=True)
+    activity = db.relationship("Activity", backref=db.backref("broadcasts", lazy="dynamic", cascade="all, delete-orphan"))
+
+    @property
+    def pending(self):
+        return self.total - self.sent - self.failed
+
+
+class BroadcastRecipient(db.Model):
+    __tablename__ = "broadcast_recipients"
+    __table_args__ = (db.Index("idx_broadcast_recipients_status", "broadcast_id", "status"),)
+    id = db.Column(db.Integer, primary_key=True)
+    broadcast_id = db.Column(db.Integer, db.ForeignKey("broadcasts.id", ondelete="CASCADE"), nullable=False)
+    registrant_id = db.Column(db.Integer, db.ForeignKey("registrants.id", ondelete="SET NULL"), nullable=True)
+    phone = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending")  # pending, sent, failed
+    sent_at = db.Column(db.DateTime, nullable=True)
+    broadcast = db.relationship("Broadcast", backref=db.backref("recipients", lazy="dynamic", cascade="all, delete-orphan"))
+
+
+class ExportJob(db.Model):
+    """A participant export rendered in the background; the file is shared by jobs of the same data_version."""
+    __tablename__ = "export_jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    format = db.Column(db.String(16), nullable=False, default="pdf")
+    data_version = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="queued")  # queued, running, done, failed
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    finished_at = db.Column(db.DateTime, nullable=True)
+    activity = db.relationship("Activity", backref=db.backref("export_jobs", lazy="dynamic", cascade="all, delete-orphan"))
+
+    @property
+    def filename(self):
+        return f"{self.activity_id}-{self.data_version}.{self.format}"
+
+
 class ActivityLog(db.Model):
     __tablename__ = "activity_log"
     id = db.Column(db.Integer, primary_key=True)
@@ -124,7 +256,7 @@ class ActivityLog(db.Model):
     entity_type = db.Column(db.String(64), nullable=True)  # year, activity, registrant, about, etc.
     entity_id = db.Column(db.String(64), nullable=True)
     details = db.Column(db.Text, nullable=True)  # JSON or short description
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    created_at = db.Column(db.DateTime().with_variant(_SQLITE_SECONDS, "sqlite"), server_default=db.func.now())
     user = db.relationship("User", backref="activity_logs")
 
 
@@ -1,17 +1,16 @@
 """Admin routes: login, years, activities, registrants, about, contact, gallery, backup, activity log, PDF export, QR."""
 import os
-import io
 from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, current_app, Response, jsonify, abort, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed
 from wtforms import StringField, EmailField, PasswordField, SubmitField, TextAreaField, SelectField, IntegerField, DateField, BooleanField
 from wtforms.validators import DataRequired, Email, Optional
-import qrcode
 
 from app.models import db, User, Year, Activity, Registrant, Gallery
 from app.utils.decorators import operator_or_above, super_admin_required
+from app.utils.perf import recent_requests, route_summary
 from app.services.auth_service import get_user_by_email, verify_password
 from app.services.year_service import get_all_years, set_active_year, create_year, update_year, delete_year
 from app.services.activity_service import (
@@ -23,14 +22,18 @@ from app.services.activity_service import (
     save_guideline_file,
 )
 from app.services.registrant_service import (
-    get_registrants_for_activity,
+    get_registrants_page,
     verify_registrant,
     set_registrant_status,
     mark_attended,
     ensure_check_in_code,
+    bulk_update_registrants,
+    BULK_ACTIONS,
 )
 from app.services.about_service import get_about, update_about
-from app.services.contact_service import get_all_messages
+from app.services.contact_service import get_messages_page
+from app.services.search_service import search
+from app.services.backup_service import backup_path, list_backups, start_backup
 from app.services.gallery_service import (
     get_gallery_for_activity,
     save_gallery_image,
@@ -38,13 +41,33 @@ from app.services.gallery_service import (
     delete_gallery_item,
     set_featured,
 )
-from app.services.activity_log_service import log_action, get_recent_logs
+from app.services.activity_log_service import log_action, get_logs_page
 from app.services.dashboard_service import get_dashboard_stats
-from app.services.pdf_export_service import export_registrants_pdf
 from app.services.sponsor_service import SponsorService
+from app.services.qr_service import get_qr, get_qr_svgs
+from app.services.export_service import (
+    artifact_path,
+    get_export_job_or_404,
+    is_pending,
+    is_stale,
+    request_export,
+)
+from app.services.tabular_export_service import FORMATS as EXPORT_FORMATS, iter_export, registrant_rows
+from app.services.broadcast_service import (
+    create_broadcast,
+    get_broadcasts_for_activity,
+    get_broadcast_or_404,
+    is_resumable,
+)
 
 admin_bp = Blueprint("admin", __name__)
 
+REGISTRANTS_PER_PAGE = 50
+LOGS_PER_PAGE = 100
+SEARCH_PER_PAGE = 20
+SEARCH_KINDS = {"registrants": "Pendaftar", "activities": "Acara", "messages": "Pesan kontak"}
+PERF_SLOWEST_REQUESTS = 20
+
 
 # ---- Auth forms ----
 class LoginForm(FlaskForm):
@@ -89,6 +112,12 @@ class GalleryUploadForm(FlaskForm):
     submit = SubmitField("Upload")
 
 
+# ---- Broadcast form ----
+class BroadcastForm(FlaskForm):
+    message = TextAreaField("Pesan", validators=[DataRequired()])
+    submit = SubmitField("Kirim")
+
+
 # ---- Sponsor form ----
 class SponsorForm(FlaskForm):
     name = StringField("Nama Sponsor", validators=[DataRequired()])
@@ -97,6 +126,10 @@ class SponsorForm(FlaskForm):
     submit = SubmitField("Simpan")
 
 
+def _checkin_url(code):
+    return request.url_root.rstrip("/") + url_for("public.checkin", code=code, _external=False)
+
+
 # ---- Routes ----
 @admin_bp.route("/login", methods=["GET", "POST"])
 def login():
@@ -266,32 +299,122 @@ def activity_delete(activity_id):
 
 
 # ---- Registrants ----
+def _registrant_filters():
+    """q, status, attended (1/0) and from/to (YYYY-MM-DD) query args as filter_registrants keywords."""
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+        except ValueError:
+            return None
+
+    attended = request.args.get("attended")
+    return {
+        "search": request.args.get("q", "").strip() or None,
+        "status": request.args.get("status") or None,
+        "attended": {"1": True, "0": False}.get(attended),
+        "date_from": parse_date(request.args.get("from")),
+        "date_to": parse_date(request.args.get("to")),
+    }
+
+
+def _cursor(row):
+    """Keyset cursor for a row ordered by (created_at, id)."""
+    return f"{row.created_at.strftime('%Y%m%d%H%M%S%f')}-{row.id}"
+
+
+def _parse_cursor(value):
+    """(created_at, id) from a _cursor string, or None if absent or malformed."""
+    try:
+        stamp, reg_id = value.split("-")
+        return datetime.strptime(stamp, "%Y%m%d%H%M%S%f"), int(reg_id)
+    except (AttributeError, ValueError):
+        return None
+
+
 @admin_bp.route("/activities/<int:activity_id>/registrants", methods=["GET"])
 @login_required
 @operator_or_above
 def registrants_list(activity_id):
     activity = get_activity_or_404(activity_id)
-    registrants = get_registrants_for_activity(activity_id)
-    base_url = request.url_root.rstrip("/")
-    for r in registrants:
-        ensure_check_in_code(r)
+    filters = _registrant_filters()
+    registrants, has_prev, has_next = get_registrants_page(
+        activity_id,
+        after=_parse_cursor(request.args.get("after")),
+        before=_parse_cursor(request.args.get("before")),
+        per_page=REGISTRANTS_PER_PAGE,
+        **filters,
+    )
+    # Legacy rows without a check-in code get no QR here; the list never writes
+    qr_svgs = get_qr_svgs((r.check_in_code, _checkin_url(r.check_in_code)) for r in registrants if r.check_in_code)
+    # Filter args carried over into the pagination links
+    args = {k: v for k, v in request.args.items() if k not in ("after", "before") and v}
     return render_template(
         "admin/registrants.html",
         activity=activity,
         registrants=registrants,
-        checkin_base_url=base_url,
+        qr_svgs=qr_svgs,
+        filters=filters,
+        args=args,
+        prev_cursor=_cursor(registrants[0]) if has_prev and registrants else None,
+        next_cursor=_cursor(registrants[-1]) if has_next and registrants else None,
+        checkin_base_url=request.url_root.rstrip("/"),
     )
 
 
-@admin_bp.route("/activities/<int:activity_id>/registrants/export-pdf", methods=["GET"])
+@admin_bp.route("/activities/<int:activity_id>/registrants/export-pdf", methods=["POST"])
 @login_required
 @operator_or_above
 def registrants_export_pdf(activity_id):
+    job = request_export(activity_id, "pdf", user_id=current_user.id)
+    return redirect(url_for("admin.export_job_detail", job_id=job.id))
+
+
+@admin_bp.route("/activities/<int:activity_id>/registrants/export.<fmt>", methods=["GET"])
+@login_required
+@operator_or_above
+def registrants_export_table(activity_id, fmt):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
     activity = get_activity_or_404(activity_id)
-    registrants = get_registrants_for_activity(activity_id)
-    buffer = export_registrants_pdf(activity, registrants)
-    filename = f"participants-{activity.title[:30].replace(' ', '-')}.pdf"
-    return send_file(buffer, mimetype="application/pdf", as_attachment=True, download_name=filename)
+    rows = registrant_rows(activity_id, **_registrant_filters())
+    filename = f"participants-{activity.title[:30].replace(' ', '-')}.{fmt}"
+    response = Response(stream_with_context(iter_export(fmt, rows)), mimetype=EXPORT_FORMATS[fmt])
+    response.headers.set("Content-Disposition", "attachment", filename=filename)
+    return response
+
+
+@admin_bp.route("/exports/<int:job_id>", methods=["GET"])
+@login_required
+@operator_or_above
+def export_job_detail(job_id):
+    job = get_export_job_or_404(job_id)
+    return render_template("admin/export_job.html", job=job, pending=is_pending(job) and not is_stale(job))
+
+
+@admin_bp.route("/exports/<int:job_id>/status", methods=["GET"])
+@login_required
+@operator_or_above
+def export_job_status(job_id):
+    job = get_export_job_or_404(job_id)
+    status = "failed" if is_stale(job) else job.status
+    return jsonify(
+        id=job.id,
+        status=status,
+        download_url=url_for("admin.export_job_download", job_id=job.id) if status == "done" else None,
+    )
+
+
+@admin_bp.route("/exports/<int:job_id>/download", methods=["GET"])
+@login_required
+@operator_or_above
+def export_job_download(job_id):
+    job = get_export_job_or_404(job_id)
+    path = artifact_path(job)
+    if job.status != "done" or not os.path.isfile(path):
+        flash("File ekspor sudah tidak tersedia. Silakan ekspor ulang.", "warning")
+        return redirect(url_for("admin.registrants_list", activity_id=job.activity_id))
+    filename = f"participants-{job.activity.title[:30].replace(' ', '-')}.{job.format}"
+    return send_file(path, as_attachment=True, download_name=filename)
 
 
 @admin_bp.route("/registrants/<int:registrant_id>/qr", methods=["GET"])
@@ -300,12 +423,13 @@ def registrants_export_pdf(activity_id):
 def registrant_qr(registrant_id):
     reg = Registrant.query.get_or_404(registrant_id)
     ensure_check_in_code(reg)
-    checkin_url = request.url_root.rstrip("/") + url_for("public.checkin", code=reg.check_in_code, _external=False)
-    img = qrcode.make(checkin_url)
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
-    return send_file(buffer, mimetype="image/png")
+    data, etag = get_qr(reg.check_in_code, _checkin_url(reg.check_in_code))
+    response = Response(data, mimetype="image/png")
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
 
 
 @admin_bp.route("/registrants/<int:registrant_id>/verify", methods=["POST"])
@@ -343,6 +467,71 @@ def registrant_status(registrant_id):
     return redirect(url_for("admin.registrants_list", activity_id=reg.activity_id))
 
 
+@admin_bp.route("/activities/<int:activity_id>/registrants/bulk", methods=["POST"])
+@login_required
+@operator_or_above
+def registrants_bulk(activity_id):
+    """Apply verify / pending / attend to the checked registrants; JSON for fetch(), redirect otherwise."""
+    activity = get_activity_or_404(activity_id)
+    action = request.form.get("action")
+    ids = [int(i) for i in request.form.getlist("ids") if i.isdigit()]
+    wants_json = request.accept_mimetypes.best == "application/json"
+    if action not in BULK_ACTIONS or not ids:
+        if wants_json:
+            return jsonify(error="Pilih pendaftar dan aksi."), 400
+        flash("Pilih pendaftar dan aksi.", "warning")
+        return redirect(url_for("admin.registrants_list", activity_id=activity_id))
+    changed = bulk_update_registrants(activity_id, ids, action)
+    log_action(f"bulk_{action}", entity_type="activity", entity_id=activity_id, details=f"{changed} dari {len(ids)} pendaftar")
+    if wants_json:
+        return jsonify(
+            action=action,
+            ids=ids,
+            changed=changed,
+            registered_count=activity.registered_count,
+            verified_count=activity.verified_count,
+            attended_count=activity.attended_count,
+            attended_at=datetime.utcnow().strftime("%d/%m %H:%M"),
+        )
+    flash(f"{changed} pendaftar diperbarui.", "success")
+    return redirect(url_for("admin.registrants_list", activity_id=activity_id))
+
+
+@admin_bp.route("/scanner", methods=["GET"])
+@login_required
+@operator_or_above
+def scanner():
+    """Event-day scanner: queues scans in the browser and syncs them to /api/checkins."""
+    return render_template("admin/scanner.html")
+
+
+# ---- WhatsApp broadcast ----
+@admin_bp.route("/activities/<int:activity_id>/broadcasts", methods=["GET", "POST"])
+@login_required
+@operator_or_above
+def activity_broadcasts(activity_id):
+    activity = get_activity_or_404(activity_id)
+    form = BroadcastForm()
+    if form.validate_on_submit():
+        broadcast = create_broadcast(activity_id, form.message.data, user_id=current_user.id)
+        log_action("broadcast", entity_type="activity", entity_id=activity_id, details=f"{broadcast.total} penerima")
+        if broadcast.total:
+            flash(f"Broadcast ke {broadcast.total} peserta terverifikasi masuk antrean pengiriman.", "success")
+        else:
+            flash("Tidak ada peserta terverifikasi dengan nomor telepon.", "warning")
+        return redirect(url_for("admin.broadcast_detail", broadcast_id=broadcast.id))
+    broadcasts = get_broadcasts_for_activity(activity_id)
+    return render_template("admin/broadcasts.html", activity=activity, broadcasts=broadcasts, form=form)
+
+
+@admin_bp.route("/broadcasts/<int:broadcast_id>", methods=["GET"])
+@login_required
+@operator_or_above
+def broadcast_detail(broadcast_id):
+    broadcast = get_broadcast_or_404(broadcast_id)
+    return render_template("admin/broadcast_detail.html", broadcast=broadcast, resumable=is_resumable(broadcast))
+
+
 # ---- About ----
 @admin_bp.route("/about", methods=["GET", "POST"])
 @login_required
@@ -368,8 +557,36 @@ def about_edit():
 @login_required
 @operator_or_above
 def contact_messages():
-    messages = get_all_messages()
-    return render_template("admin/contact_messages.html", messages=messages)
+    q = request.args.get("q", "").strip()
+    if q:
+        return redirect(url_for("admin.search_page", q=q, kind="messages"))
+    messages, has_next = get_messages_page(before_id=request.args.get("before", type=int))
+    return render_template(
+        "admin/contact_messages.html",
+        messages=messages,
+        next_before=messages[-1].id if has_next and messages else None,
+    )
+
+
+@admin_bp.route("/search", methods=["GET"])
+@login_required
+@operator_or_above
+def search_page():
+    q = request.args.get("q", "").strip()
+    kind = request.args.get("kind", "registrants")
+    if kind not in SEARCH_KINDS:
+        kind = "registrants"
+    page = request.args.get("page", 1, type=int)
+    results, has_next = search(kind, q, page=page, per_page=SEARCH_PER_PAGE) if q else ([], False)
+    return render_template(
+        "admin/search.html",
+        q=q,
+        kind=kind,
+        kinds=SEARCH_KINDS,
+        results=results,
+        page=page,
+        has_next=has_next,
+    )
 
 
 # ---- Gallery ----
@@ -428,8 +645,31 @@ def gallery_item_featured(item_id):
 @login_required
 @super_admin_required
 def activity_log():
-    logs = get_recent_logs(limit=100)
-    return render_template("admin/activity_log.html", logs=logs)
+    filters = {
+        "user_id": request.args.get("user_id", type=int),
+        "action": request.args.get("action", "").strip() or None,
+        "entity_type": request.args.get("entity_type", "").strip() or None,
+    }
+    logs, has_next = get_logs_page(after=_parse_cursor(request.args.get("after")), per_page=LOGS_PER_PAGE, **filters)
+    args = {k: v for k, v in request.args.items() if k != "after" and v}
+    return render_template(
+        "admin/activity_log.html",
+        logs=logs,
+        filters=filters,
+        args=args,
+        users=User.query.order_by(User.email).all(),
+        next_cursor=_cursor(logs[-1]) if has_next and logs else None,
+    )
+
+
+# ---- Performance (Super Admin only) ----
+@admin_bp.route("/perf", methods=["GET"])
+@login_required
+@super_admin_required
+def perf_page():
+    records = recent_requests()
+    slowest = sorted(records, key=lambda r: r["total_ms"], reverse=True)[:PERF_SLOWEST_REQUESTS]
+    return render_template("admin/perf.html", routes=route_summary(records), slowest=slowest, sampled=len(records))
 
 
 # ---- Backup (Super Admin only) ----
@@ -437,17 +677,33 @@ def activity_log():
 @login_required
 @super_admin_required
 def backup():
-    db_uri = current_app.config["SQLALCHEMY_DATABASE_URI"]
-    if not db_uri.startswith("sqlite:///"):
-        flash("Cadangan hanya didukung untuk basis data SQLite.", "warning")
-        return redirect(url_for("admin.dashboard"))
-    path = db_uri.replace("sqlite:///", "")
-    if not os.path.isfile(path):
-        flash("Berkas basis data tidak ditemukan.", "error")
-        return redirect(url_for("admin.dashboard"))
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    download_name = f"goslides-backup-{timestamp}.db"
-    return send_file(path, as_attachment=True, download_name=download_name)
+    backups = list_backups()
+    pending = any(b["pending"] for b in backups)
+    return render_template("admin/backups.html", backups=backups, pending=pending)
+
+
+@admin_bp.route("/backup", methods=["POST"])
+@login_required
+@super_admin_required
+def backup_create():
+    if start_backup():
+        log_action("backup_create", "backup")
+        flash("Pencadangan dimulai. Berkas akan muncul di daftar setelah selesai.", "success")
+    else:
+        flash("Pencadangan lain sedang berjalan.", "warning")
+    return redirect(url_for("admin.backup"))
+
+
+@admin_bp.route("/backup/<name>", methods=["GET"])
+@login_required
+@super_admin_required
+def backup_download(name):
+    path = backup_path(name)
+    if path is None:
+        flash("Berkas cadangan tidak ditemukan.", "error")
+        return redirect(url_for("admin.backup"))
+    log_action("backup_download", "backup", name)
+    return send_file(path, as_attachment=True, download_name=name)
 
 
 # ---- Sponsor ----
@@ -0,0 +1,25 @@
+"""JSON API for event-day scanner devices."""
+from flask import Blueprint, current_app, jsonify, request
+
+from app.services.registrant_service import apply_checkins
+from app.utils.decorators import checkin_api_auth
+
+api_bp = Blueprint("api", __name__)
+
+
+@api_bp.route("/checkins", methods=["POST"])
+@checkin_api_auth
+def checkins():
+    """
+    Body: {"scans": [{"code": "...", "scanned_at": "2026-05-01T08:15:00Z"}, ...]}.
+    Safe to retry: scans already applied come back as "already".
+    """
+    payload = request.get_json(silent=True) or {}
+    scans = payload.get("scans")
+    if not isinstance(scans, list) or not all(isinstance(scan, dict) for scan in scans):
+        return jsonify(error="scans must be a list of objects"), 400
+    limit = current_app.config.get("CHECKIN_API_MAX_BATCH", 500)
+    if len(scans) > limit:
+        return jsonify(error=f"at most {limit} scans per request"), 413
+    results = apply_checkins(scans)
+    return jsonify(results=results, checked_in=sum(1 for r in results if r["status"] == "checked_in"))
@@ -1,7 +1,7 @@
 
 import os
 from datetime import date
-from flask import Blueprint, render_template, redirect, url_for, flash, send_from_directory, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app
 from flask_wtf import FlaskForm
 from wtforms import StringField, EmailField, SubmitField, TextAreaField
 from wtforms.validators import DataRequired, Email
@@ -12,6 +12,8 @@ from app.services.activity_service import get_activities_for_year, get_activity_
 from app.services.registrant_service import create_registrant
 from app.services.about_service import get_about
 from app.services.contact_service import create_message
+from app.utils.uploads import send_upload
+from app.utils.page_cache import cached_page
 
 
 """Public routes: landing, events, competition detail, guidelines, registration, about, contact, gallery."""
@@ -20,11 +22,11 @@ public_bp = Blueprint("public", __name__)
 @public_bp.route("/uploads/sponsor/<path:filename>")
 def serve_sponsor_logo(filename):
     folder = os.path.join(current_app.root_path, "uploads", "sponsor")
-    return send_from_directory(folder, filename)
+    # Logo names embed the upload timestamp, so a given URL never changes content
+    return send_upload("sponsor", folder, filename, immutable=True)
 
 from app.services.gallery_service import get_gallery_for_activity, get_featured_photos, get_recent_gallery_photos
 from app.services.registrant_service import mark_attended_by_code, get_registrant_by_check_in_code
-from app.services.whatsapp_service import notify_registration_confirmation
 from app.services.sponsor_service import SponsorService
 
 
@@ -53,9 +55,10 @@ def _next_countdown_date(activities):
 
 
 @public_bp.route("/")
+@cached_page
 def index():
     active_year = get_active_year()
-    activities = get_activities_for_year(year_active=True) if active_year else []
+    activities = get_activities_for_year(year_active=True, with_covers=True) if active_year else []
     countdown_date = _next_countdown_date(activities) if activities else None
     featured = get_featured_photos(limit=8)
     gallery_photos = featured if featured else get_recent_gallery_photos(limit=8)
@@ -72,13 +75,15 @@ def index():
 
 
 @public_bp.route("/events")
+@cached_page
 def events():
     active_year = get_active_year()
-    activities = get_activities_for_year(year_active=True) if active_year else []
+    activities = get_activities_for_year(year_active=True, with_covers=True) if active_year else []
     return render_template("public/events.html", active_year=active_year, activities=activities)
 
 
 @public_bp.route("/about")
+@cached_page
 def about():
     about_content = get_about()
     return render_template("public/about.html", about_content=about_content)
@@ -96,6 +101,7 @@ def contact():
 
 
 @public_bp.route("/competition/<int:activity_id>")
+@cached_page
 def competition_detail(activity_id):
     activity = get_activity_or_404(activity_id)
     gallery = get_gallery_for_activity(activity_id)
@@ -119,9 +125,12 @@ def download_guideline(activity_id):
     if not os.path.isfile(path):
         flash("Berkas panduan tidak ditemukan.", "error")
         return redirect(url_for("public.competition_detail", activity_id=activity_id))
-    return send_from_directory(
-        str(folder),
+    # The URL is per activity and the file behind it can be replaced, so revalidate via ETag
+    return send_upload(
+        "guidelines",
+        folder,
         activity.guideline_file,
+        immutable=False,
         as_attachment=True,
         download_name=f"guideline-{activity.title[:30].replace(' ', '-')}.pdf",
     )
@@ -143,7 +152,9 @@ def register(activity_id):
             phone=form.phone.data,
             email=form.email.data,
         )
-        notify_registration_confirmation(reg, activity)
+        if reg is None:
+            flash("Pendaftaran belum dibuka atau kuota sudah penuh.", "warning")
+            return redirect(url_for("public.competition_detail", activity_id=activity_id))
         flash("Pendaftaran berhasil dikirim. Kami akan memverifikasi pendaftaran Anda segera.", "success")
         return redirect(url_for("public.competition_detail", activity_id=activity_id))
 
@@ -151,6 +162,7 @@ def register(activity_id):
 
 
 @public_bp.route("/competition/<int:activity_id>/gallery")
+@cached_page
 def activity_gallery(activity_id):
     activity = get_activity_or_404(activity_id)
     gallery = get_gallery_for_activity(activity_id)
@@ -160,7 +172,7 @@ def activity_gallery(activity_id):
 @public_bp.route("/uploads/gallery/<path:filename>")
 def serve_gallery_image(filename):
     folder = current_app.config["GALLERY_UPLOAD_FOLDER"]
-    return send_from_directory(str(folder), filename)
+    return send_upload("gallery", folder, filename)
 
 
 @public_bp.route("/checkin/<code>")
@@ -1,18 +1,30 @@
 """About page content (singleton)."""
+from sqlalchemy import select
 from app.models import db, About
+from app.utils.data_version import bump_version
+from app.utils.site_cache import get_cached
 
 
-def get_about():
+def _get_or_create_about():
     row = About.query.first()
     if row is None:
         row = About(title="About Go Slides", description="", goals="", location="")
         db.session.add(row)
         db.session.commit()
+        bump_version("site")
+    return row
+
+
+def get_about():
+    """Cached singleton; the row is created only on the first read of an empty table."""
+    row = get_cached("about", select(About).limit(1))
+    if row is None:
+        row = _get_or_create_about()
     return row
 
 
 def update_about(title=None, description=None, goals=None, location=None):
-    row = get_about()
+    row = _get_or_create_about()
     if title is not None:
         row.title = title
     if description is not None:
@@ -22,4 +34,5 @@ def update_about(title=None, description=None, goals=None, location=None):
     if location is not None:
         row.location = location
     db.session.commit()
+    bump_version("data", "site")
     return row
@@ -1,23 +1,156 @@
 """Activity logging for admin actions."""
+import atexit
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
 from flask_login import current_user
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import joinedload
 from app.models import db, ActivityLog
 
 
+class _LogBuffer:
+    """
+    Per-process queue of log rows, written with one multi-row INSERT on its own connection.
+    Flushed when AUDIT_LOG_BATCH rows are waiting, when the oldest is AUDIT_LOG_FLUSH_SECONDS
+    old (by a background timer), before the log is read, and at interpreter exit. Only used when
+    AUDIT_LOG_BATCH > 1: rows still queued are lost if the process is killed without exiting.
+    """
+
+    def __init__(self):
+        self._rows = []
+        self._lock = threading.Lock()
+        self._app = None
+        self._timer = None
+        atexit.register(self.flush)
+
+    def add(self, row):
+        app = current_app._get_current_object()
+        with self._lock:
+            self._app = app
+            self._rows.append(row)
+            full = len(self._rows) >= app.config.get("AUDIT_LOG_BATCH", 1)
+            if not full and self._timer is None:
+                self._timer = threading.Timer(app.config.get("AUDIT_LOG_FLUSH_SECONDS", 2), self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            app = self._app
+        if not rows:
+            return 0
+        try:
+            with app.app_context(), db.engine.begin() as conn:
+                conn.execute(insert(ActivityLog), rows)
+        except Exception:
+            app.logger.exception("Could not write %d activity log entries", len(rows))
+            return 0
+        return len(rows)
+
+
+_buffer = _LogBuffer()
+
+
 def log_action(action, entity_type=None, entity_id=None, details=None):
-    """Record an action in the activity log."""
+    """
+    Record an action in the activity log. By default the entry is committed right away in the
+    caller's session; with AUDIT_LOG_BATCH > 1 it is buffered and written in a batch outside the
+    caller's transaction (see _LogBuffer for what a hard kill loses).
+    """
     user_id = current_user.id if current_user.is_authenticated else None
-    entry = ActivityLog(
-        user_id=user_id,
-        action=action,
-        entity_type=entity_type,
-        entity_id=str(entity_id) if entity_id is not None else None,
-        details=details,
-    )
-    db.session.add(entry)
-    db.session.commit()
-    return entry
+    row = {
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id) if entity_id is not None else None,
+        "details": details,
+        "created_at": datetime.utcnow(),
+    }
+    if current_app.config.get("AUDIT_LOG_BATCH", 1) <= 1:
+        db.session.execute(insert(ActivityLog), [row])
+        db.session.commit()
+    else:
+        _buffer.add(row)
+
+
+def flush_logs():
+    """Write this process's buffered entries now; returns how many were written."""
+    return _buffer.flush()
 
 
 def get_recent_logs(limit=50):
     """Get most recent activity log entries."""
-    return ActivityLog.query.order_by(ActivityLog.created_at.desc()).limit(limit).all()
+    flush_logs()
+    return ActivityLog.query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit).all()
+
+
+def get_logs_page(after=None, per_page=50, user_id=None, action=None, entity_type=None):
+    """
+    One page of log entries, newest first, keyset-paginated on (created_at, id). after is
+    (created_at, id) of the last row of the previous page. Returns (logs, has_next).
+    """
+    flush_logs()
+    query = ActivityLog.query.options(joinedload(ActivityLog.user))
+    if user_id:
+        query = query.filter(ActivityLog.user_id == user_id)
+    if action:
+        query = query.filter(ActivityLog.action == action)
+    if entity_type:
+        query = query.filter(ActivityLog.entity_type == entity_type)
+    if after:
+        created_at, log_id = after
+        query = query.filter(or_(
+            ActivityLog.created_at < created_at,
+            and_(ActivityLog.created_at == created_at, ActivityLog.id < log_id),
+        ))
+    rows = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
+
+
+def prune_logs(older_than_days, archive_path=None, batch_size=1000):
+    """
+    Delete entries older than the given number of days, oldest first in batches. With
+    archive_path, each entry is first appended to that gzip JSON Lines file.
+    Returns the number of entries removed.
+    """
+    flush_logs()
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archive = gzip.open(archive_path, "at", encoding="utf-8") if archive_path else None
+    removed = 0
+    try:
+        while True:
+            batch = (
+                ActivityLog.query.filter(ActivityLog.created_at < cutoff)
+                .order_by(ActivityLog.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                return removed
+            if archive:
+                for log in batch:
+                    archive.write(json.dumps({
+                        "id": log.id,
+                        "user_id": log.user_id,
+                        "action": log.action,
+                        "entity_type": log.entity_type,
+                        "entity_id": log.entity_id,
+                        "details": log.details,
+                        "created_at": log.created_at.isoformat() if log.created_at else None,
+                    }, ensure_ascii=False) + "\n")
+                archive.flush()
+            ActivityLog.query.filter(ActivityLog.id.in_([log.id for log in batch])).delete(synchronize_session=False)
+            db.session.commit()
+            removed += len(batch)
+    finally:
+        if archive:
+            archive.close()
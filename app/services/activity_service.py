@@ -2,16 +2,28 @@
 import os
 import uuid
 from flask import current_app
-from app.models import db, Activity
+from sqlalchemy import and_, case, func, or_, update
+from app.models import db, Activity, Registrant
+from app.services.gallery_service import get_cover_images
+from app.utils.data_version import bump_version
 
 
-def get_activities_for_year(year_id=None, year_active=False):
+def get_activities_for_year(year_id=None, year_active=False, with_covers=False):
+    """
+    Activities in display order; registration counts come with them (denormalized counters).
+    with_covers sets act.cover_image (a Gallery or None) on each, resolved in one extra query.
+    """
     q = Activity.query
     if year_id is not None:
         q = q.filter_by(year_id=year_id)
     if year_active:
         q = q.join(Activity.year).filter_by(active=True)
-    return q.order_by(Activity.date.asc().nulls_last(), Activity.created_at.desc()).all()
+    activities = q.order_by(Activity.date.asc().nulls_last(), Activity.created_at.desc()).all()
+    if with_covers:
+        covers = get_cover_images([act.id for act in activities])
+        for act in activities:
+            act.cover_image = covers.get(act.id)
+    return activities
 
 
 def get_activity_or_404(activity_id):
@@ -31,6 +43,7 @@ def create_activity(year_id, title, description, date, type_, status, quota, gui
     )
     db.session.add(act)
     db.session.commit()
+    bump_version()
     return act
 
 
@@ -39,7 +52,10 @@ def update_activity(activity_id, **kwargs):
     for key, value in kwargs.items():
         if hasattr(act, key):
             setattr(act, key, value)
+    # Title and date are printed on exports
+    act.data_version = Activity.data_version + 1
     db.session.commit()
+    bump_version()
     return act
 
 
@@ -51,6 +67,7 @@ def delete_activity(activity_id):
             os.remove(path)
     db.session.delete(act)
     db.session.commit()
+    bump_version()
 
 
 def save_guideline_file(file_storage):
@@ -66,10 +83,53 @@ def save_guideline_file(file_storage):
     return filename
 
 
-def check_quota_and_close(activity):
-    """If activity has quota and registrants >= quota, set status to closed."""
-    if activity.quota is None:
-        return
-    if activity.registrants.count() >= activity.quota:
-        activity.status = "closed"
-        db.session.commit()
+def reserve_seat(activity_id):
+    """
+    Take one registration seat with a single conditional UPDATE.
+    The row lock makes concurrent reservations serialize, so registered_count never exceeds quota;
+    the activity is closed in the same statement when the last seat goes. Does not commit.
+    Returns the activity's status after the reservation ("closed" when this took the last seat),
+    or None when the activity is not open or already full.
+    """
+    result = db.session.execute(
+        update(Activity)
+        .where(
+            Activity.id == activity_id,
+            Activity.status == "open",
+            or_(Activity.quota.is_(None), Activity.registered_count < Activity.quota),
+        )
+        .values(
+            registered_count=Activity.registered_count + 1,
+            data_version=Activity.data_version + 1,
+            status=case(
+                (and_(Activity.quota.isnot(None), Activity.registered_count + 1 >= Activity.quota), "closed"),
+                else_=Activity.status,
+            ),
+        )
+        .returning(Activity.status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar()
+
+
+def reconcile_activity_counters():
+    """Recompute registrant counters from the registrants table; return ids of activities that drifted."""
+    rows = (
+        db.session.query(
+            Registrant.activity_id,
+            func.count(Registrant.id),
+            func.count(Registrant.id).filter(Registrant.status == "verified"),
+            func.count(Registrant.attended_at),
+        )
+        .group_by(Registrant.activity_id)
+        .all()
+    )
+    actual = {r[0]: (r[1], r[2], r[3]) for r in rows}
+    repaired = []
+    for act in Activity.query.all():
+        counts = actual.get(act.id, (0, 0, 0))
+        if (act.registered_count, act.verified_count, act.attended_count) != counts:
+            act.registered_count, act.verified_count, act.attended_count = counts
+            repaired.append(act.id)
+    db.session.commit()
+    return repaired
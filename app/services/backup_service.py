@@ -0,0 +1,258 @@
+"""
+Online database backups into BACKUP_FOLDER.
+SQLite: the sqlite3 backup API copies the live database in one step (one read transaction, which
+never blocks writers under WAL and cannot be restarted by them), then gzip.
+Other backends (Postgres): a logical gzip JSON Lines export, table by table in batches,
+read inside one REPEATABLE READ transaction so every table comes from the same snapshot.
+A snapshot is written as <name>.part and renamed when complete, so only finished files are listed
+as downloadable. backup.lock, created with O_EXCL, lets one process at a time write a snapshot.
+"""
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from app.models import db
+
+# A .part file untouched for this long belongs to a process that died
+STALE_AFTER = timedelta(minutes=30)
+
+_LOCK_NAME = "backup.lock"
+
+_NAME_RE = re.compile(r"^goslides-\d{8}-\d{6}\.(db|jsonl)\.gz$")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """One backup at a time per process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+        return _executor
+
+
+def _folder():
+    return str(current_app.config["BACKUP_FOLDER"])
+
+
+def _sqlite_path():
+    url = db.engine.url
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        return url.database
+    return None
+
+
+def backup_path(name):
+    """Path of a finished snapshot, or None for unknown or unfinished names."""
+    if not _NAME_RE.match(name or ""):
+        return None
+    path = os.path.join(_folder(), name)
+    return path if os.path.isfile(path) else None
+
+
+def list_backups():
+    """Snapshots newest first: dicts with name, size, created_at and pending (still being written)."""
+    folder = _folder()
+    if not os.path.isdir(folder):
+        return []
+    stale_before = time.time() - STALE_AFTER.total_seconds()
+    backups = []
+    for entry in os.scandir(folder):
+        pending = entry.name.endswith(".part")
+        name = entry.name[: -len(".part")] if pending else entry.name
+        if not _NAME_RE.match(name):
+            continue
+        stat = entry.stat()
+        if pending and stat.st_mtime < stale_before:
+            continue
+        backups.append({
+            "name": name,
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime),
+            "pending": pending,
+        })
+    backups.sort(key=lambda b: b["name"], reverse=True)
+    return backups
+
+
+def _new_name():
+    kind = "db" if _sqlite_path() else "jsonl"
+    return f"goslides-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{kind}.gz"
+
+
+def _backup_sqlite(source_path, part_path):
+    """Copy the live database into a temp file in one backup step, then gzip it into part_path."""
+    copy_path = f"{part_path}.db"
+    src = sqlite3.connect(source_path)
+    dst = sqlite3.connect(copy_path)
+    try:
+        # A stepwise copy restarts whenever another connection writes, so under steady traffic it
+        # may never finish; a single step reads one consistent snapshot while writers carry on
+        src.backup(dst, pages=-1)
+    finally:
+        dst.close()
+        src.close()
+    try:
+        with open(copy_path, "rb") as f, gzip.open(part_path, "wb", compresslevel=6) as out:
+            shutil.copyfileobj(f, out, 1024 * 1024)
+    finally:
+        os.remove(copy_path)
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _backup_logical(part_path):
+    """One header line per table ({"table", "columns"}) followed by its rows as JSON arrays."""
+    batch = current_app.config.get("BACKUP_BATCH_ROWS", 5000)
+    with db.engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn, \
+            gzip.open(part_path, "wt", encoding="utf-8", compresslevel=6) as out:
+        for table in db.metadata.sorted_tables:
+            columns = [c.name for c in table.columns]
+            out.write(json.dumps({"table": table.name, "columns": columns}) + "\n")
+            query = select(table)
+            if table.primary_key.columns:
+                query = query.order_by(*table.primary_key.columns)
+            result = conn.execution_options(stream_results=True, yield_per=batch).execute(query)
+            for rows in result.partitions():
+                out.writelines(json.dumps(list(row), default=_json_value, ensure_ascii=False) + "\n" for row in rows)
+
+
+def _lock_is_stale(lock_path, stale_before):
+    """The lock's holder died: neither the lock nor the .part file it names was touched recently."""
+    try:
+        with open(lock_path) as f:
+            part_path = os.path.join(os.path.dirname(lock_path), f"{f.read().strip()}.part")
+        touched = max(os.path.getmtime(lock_path), os.path.getmtime(part_path) if os.path.exists(part_path) else 0)
+    except FileNotFoundError:
+        return False
+    return touched < stale_before
+
+
+def _reserve():
+    """
+    Take backup.lock and create the new snapshot's empty .part file; return the name, or None
+    when another process is writing a snapshot. O_EXCL makes the check and the claim one step.
+    """
+    folder = _folder()
+    os.makedirs(folder, exist_ok=True)
+    lock_path = os.path.join(folder, _LOCK_NAME)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if not _lock_is_stale(lock_path, time.time() - STALE_AFTER.total_seconds()):
+                return None
+            os.remove(lock_path)
+    else:
+        return None
+    name = _new_name()
+    with os.fdopen(fd, "w") as f:
+        f.write(name)
+    os.close(os.open(os.path.join(folder, f"{name}.part"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    return name
+
+
+def _release():
+    try:
+        os.remove(os.path.join(_folder(), _LOCK_NAME))
+    except FileNotFoundError:
+        pass
+
+
+def create_backup(keep=None, name=None):
+    """
+    Write one snapshot now, prune beyond the newest keep and return the snapshot's name.
+    name is a snapshot already reserved by start_backup. Raises RuntimeError when another
+    process is writing a snapshot.
+    """
+    name = name or _reserve()
+    if name is None:
+        raise RuntimeError("another backup is being written")
+    path = os.path.join(_folder(), name)
+    part_path = f"{path}.part"
+    try:
+        source = _sqlite_path()
+        if source:
+            _backup_sqlite(source, part_path)
+        else:
+            _backup_logical(part_path)
+        os.replace(part_path, path)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    finally:
+        _release()
+    prune_backups(keep)
+    return name
+
+
+def _run_in_app(app, name):
+    with app.app_context():
+        try:
+            create_backup(name=name)
+        except Exception:
+            app.logger.exception("Backup failed")
+        finally:
+            db.session.remove()
+
+
+def start_backup():
+    """Start a snapshot in the background; returns False when one is already being written."""
+    name = _reserve()
+    if name is None:
+        return False
+    _get_executor().submit(_run_in_app, current_app._get_current_object(), name)
+    return True
+
+
+def prune_backups(keep=None):
+    """Delete finished snapshots beyond the newest keep (BACKUP_KEEP) and abandoned .part files."""
+    keep = current_app.config.get("BACKUP_KEEP", 14) if keep is None else keep
+    folder = _folder()
+    if not os.path.isdir(folder):
+        return []
+    stale_before = time.time() - STALE_AFTER.total_seconds()
+    removed = []
+    finished = sorted((n for n in os.listdir(folder) if _NAME_RE.match(n)), reverse=True)
+    for name in finished[keep:]:
+        os.remove(os.path.join(folder, name))
+        removed.append(name)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if ".part" in name and os.path.getmtime(path) < stale_before:
+            os.remove(path)
+            removed.append(name)
+    return removed
+
+
+def run_scheduled(every_seconds, keep=None, echo=print):
+    """Take a snapshot every every_seconds (timed from the start of each one) until interrupted."""
+    while True:
+        started = time.monotonic()
+        try:
+            name = create_backup(keep)
+            echo(f"{datetime.now():%Y-%m-%d %H:%M:%S} wrote {name} in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            current_app.logger.exception("Scheduled backup failed")
+            echo(f"{datetime.now():%Y-%m-%d %H:%M:%S} backup failed: {e}")
+        finally:
+            db.session.remove()
+        time.sleep(max(every_seconds - (time.monotonic() - started), 0))
@@ -0,0 +1,230 @@
+"""
+WhatsApp broadcast to an activity's verified registrants, sent by a bounded thread pool.
+Broadcasts are sent by the `send-notifications` worker process, never by a web worker, so a
+worker recycle or deploy cannot cut one off; the worker also resumes ones abandoned mid-run.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, literal, or_, select, update
+from app.models import db, Broadcast, BroadcastRecipient, Registrant
+from app.services.whatsapp_service import SEND_TIMEOUT, provider_name, rate_limiter, send_whatsapp_message
+
+# A running broadcast whose heartbeat is older than this is considered abandoned and may be resumed
+STALE_AFTER = timedelta(seconds=90)
+# The sender refreshes its heartbeat this often, independent of batch progress
+HEARTBEAT_EVERY = STALE_AFTER / 6
+
+
+def create_broadcast(activity_id, message, user_id=None):
+    """Create the broadcast and snapshot its recipients (verified registrants with a phone) in one statement."""
+    broadcast = Broadcast(activity_id=activity_id, message=message, status="queued", created_by=user_id)
+    db.session.add(broadcast)
+    db.session.flush()
+    recipients = select(
+        literal(broadcast.id),
+        Registrant.id,
+        Registrant.phone,
+        literal("pending"),
+    ).where(
+        Registrant.activity_id == activity_id,
+        Registrant.status == "verified",
+        Registrant.phone.isnot(None),
+        Registrant.phone != "",
+    )
+    result = db.session.execute(
+        insert(BroadcastRecipient).from_select(["broadcast_id", "registrant_id", "phone", "status"], recipients)
+    )
+    broadcast.total = result.rowcount
+    db.session.commit()
+    return broadcast
+
+
+def get_broadcasts_for_activity(activity_id):
+    return Broadcast.query.filter_by(activity_id=activity_id).order_by(Broadcast.created_at.desc()).all()
+
+
+def get_broadcast_or_404(broadcast_id):
+    return Broadcast.query.get_or_404(broadcast_id)
+
+
+def is_resumable(broadcast):
+    if broadcast.status == "queued":
+        return True
+    return broadcast.status == "running" and (
+        broadcast.heartbeat_at is None or broadcast.heartbeat_at < datetime.utcnow() - STALE_AFTER
+    )
+
+
+def _claim(broadcast_id):
+    """Mark the broadcast as running in this process unless another live process owns it."""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(Broadcast)
+        .where(
+            Broadcast.id == broadcast_id,
+            or_(
+                Broadcast.status == "queued",
+                (Broadcast.status == "running") & or_(Broadcast.heartbeat_at.is_(None), Broadcast.heartbeat_at < now - STALE_AFTER),
+            ),
+        )
+        .values(status="running", heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _keep_alive(app, broadcast_id, stop):
+    """Refresh heartbeat_at every HEARTBEAT_EVERY until stop is set, so slow sends never look abandoned."""
+    with app.app_context():
+        while not stop.wait(HEARTBEAT_EVERY.total_seconds()):
+            try:
+                Broadcast.query.filter_by(id=broadcast_id, status="running").update(
+                    {"heartbeat_at": datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Broadcast %s heartbeat failed", broadcast_id)
+        db.session.remove()
+
+
+def run_broadcast(broadcast_id, workers=None, batch_size=200):
+    """
+    Send every pending recipient of the broadcast. Statuses and progress counters are committed
+    per batch, so progress is visible while it runs and a restarted process resumes with the
+    recipients still pending. A separate thread keeps the heartbeat fresh while batches run, so
+    no other process takes over a live broadcast. Returns False if another process is already
+    sending it.
+    """
+    if not _claim(broadcast_id):
+        return False
+    broadcast = db.session.get(Broadcast, broadcast_id)
+    message = broadcast.message
+    workers = workers or current_app.config.get("BROADCAST_WORKERS", 8)
+    app = current_app._get_current_object()
+    limiter = rate_limiter(provider_name())
+    # Keep each batch well inside STALE_AFTER at the configured send rate, and also when every
+    # send runs into the provider timeout
+    window = STALE_AFTER.total_seconds() / 3
+    batch_size = max(workers, min(batch_size, int(limiter.rate * window), int(workers * window / SEND_TIMEOUT)))
+
+    def send(phone):
+        with app.app_context():
+            limiter.acquire()
+            return send_whatsapp_message(phone, message)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_alive, args=(app, broadcast_id, stop), name=f"broadcast-{broadcast_id}-heartbeat", daemon=True
+    )
+    heartbeat.start()
+    try:
+        _send_pending(broadcast_id, batch_size, workers, send)
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    Broadcast.query.filter_by(id=broadcast_id).update(
+        {"status": "done", "finished_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+    return True
+
+
+def _send_pending(broadcast_id, batch_size, workers, send):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = db.session.execute(
+                select(BroadcastRecipient.id, BroadcastRecipient.phone)
+                .where(BroadcastRecipient.broadcast_id == broadcast_id, BroadcastRecipient.status == "pending")
+                .order_by(BroadcastRecipient.id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            results = list(pool.map(send, [phone for _, phone in batch]))
+            now = datetime.utcnow()
+            sent_ids = [rid for (rid, _), ok in zip(batch, results) if ok]
+            failed_ids = [rid for (rid, _), ok in zip(batch, results) if not ok]
+            if sent_ids:
+                BroadcastRecipient.query.filter(BroadcastRecipient.id.in_(sent_ids)).update(
+                    {"status": "sent", "sent_at": now}, synchronize_session=False
+                )
+            if failed_ids:
+                BroadcastRecipient.query.filter(BroadcastRecipient.id.in_(failed_ids)).update(
+                    {"status": "failed"}, synchronize_session=False
+                )
+            Broadcast.query.filter_by(id=broadcast_id).update(
+                {
+                    Broadcast.sent: Broadcast.sent + len(sent_ids),
+                    Broadcast.failed: Broadcast.failed + len(failed_ids),
+                    Broadcast.heartbeat_at: now,
+                },
+                synchronize_session=False,
+            )
+            db.session.commit()
+
+
+_running = {}
+_running_lock = threading.Lock()
+
+
+def start_broadcast(broadcast_id):
+    """Run the broadcast on a background thread of this process."""
+    app = current_app._get_current_object()
+
+    def target():
+        with app.app_context():
+            try:
+                run_broadcast(broadcast_id)
+            except Exception:
+                app.logger.exception("Broadcast %s stopped", broadcast_id)
+
+    thread = threading.Thread(target=target, name=f"broadcast-{broadcast_id}", daemon=True)
+    thread.start()
+    with _running_lock:
+        _running[broadcast_id] = thread
+    return thread
+
+
+def dispatch_broadcasts():
+    """
+    Start a sender thread for each queued or abandoned broadcast this process is not already
+    sending; return their ids. Called from the outbox worker loop.
+    """
+    started = []
+    candidates = (
+        Broadcast.query.filter(Broadcast.status.in_(("queued", "running")))
+        .order_by(Broadcast.id)
+        .execution_options(populate_existing=True)
+        .all()
+    )
+    for broadcast in candidates:
+        with _running_lock:
+            thread = _running.get(broadcast.id)
+            busy = thread is not None and thread.is_alive()
+        if not busy and is_resumable(broadcast):
+            start_broadcast(broadcast.id)
+            started.append(broadcast.id)
+    return started
+
+
+def wait_for_broadcasts():
+    """Block until this process's broadcast threads have finished."""
+    with _running_lock:
+        threads = list(_running.values())
+    for thread in threads:
+        thread.join()
+
+
+def resume_broadcasts():
+    """Run every queued or abandoned broadcast to completion in this process; return their ids."""
+    resumed = []
+    candidates = Broadcast.query.filter(Broadcast.status.in_(("queued", "running"))).order_by(Broadcast.id).all()
+    for broadcast in candidates:
+        if is_resumable(broadcast) and run_broadcast(broadcast.id):
+            resumed.append(broadcast.id)
+    return resumed
@@ -9,5 +9,10 @@ def create_message(name, email, message):
     return msg
 
 
-def get_all_messages():
-    return ContactMessage.query.order_by(ContactMessage.created_at.desc()).all()
+def get_messages_page(before_id=None, per_page=50):
+    """Newest messages first, keyset-paginated on id. Returns (messages, has_next)."""
+    query = ContactMessage.query
+    if before_id:
+        query = query.filter(ContactMessage.id < before_id)
+    rows = query.order_by(ContactMessage.id.desc()).limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
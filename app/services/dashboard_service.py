@@ -1,46 +1,103 @@
 """Dashboard statistics for Chart.js and summary cards."""
 from datetime import datetime, timedelta
 from sqlalchemy import func
-from app.models import Year, Activity, Registrant
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, Activity, Registrant, RegistrationDailyStat
+
+
+def bump_daily_stats(activity_id, registrations=0, attendances=0, day=None):
+    """Add to the activity's rollup row for the day (UTC) inside the current transaction."""
+    day = day or datetime.utcnow().date()
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(RegistrationDailyStat).values(
+        activity_id=activity_id,
+        day=day,
+        registrations=registrations,
+        attendances=attendances,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["activity_id", "day"],
+        set_={
+            "registrations": RegistrationDailyStat.registrations + stmt.excluded.registrations,
+            "attendances": RegistrationDailyStat.attendances + stmt.excluded.attendances,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_daily_stats():
+    """Recompute the whole rollup table from registrants; return the number of rows written."""
+    created_day = func.date(Registrant.created_at)
+    attended_day = func.date(Registrant.attended_at)
+    totals = {}
+    for activity_id, day, n in (
+        db.session.query(Registrant.activity_id, created_day, func.count(Registrant.id))
+        .group_by(Registrant.activity_id, created_day)
+    ):
+        totals.setdefault((activity_id, str(day)), [0, 0])[0] = n
+    for activity_id, day, n in (
+        db.session.query(Registrant.activity_id, attended_day, func.count(Registrant.id))
+        .filter(Registrant.attended_at.isnot(None))
+        .group_by(Registrant.activity_id, attended_day)
+    ):
+        totals.setdefault((activity_id, str(day)), [0, 0])[1] = n
+
+    RegistrationDailyStat.query.delete()
+    rows = [
+        {
+            "activity_id": activity_id,
+            "day": datetime.strptime(day, "%Y-%m-%d").date(),
+            "registrations": regs,
+            "attendances": attended,
+        }
+        for (activity_id, day), (regs, attended) in totals.items()
+        if day != "None"
+    ]
+    if rows:
+        db.session.execute(RegistrationDailyStat.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
 
 
 def get_dashboard_stats(active_year=None):
     """Return stats for dashboard: counts and time-series for Chart.js."""
     if active_year:
-        year_id = active_year.id
-        activities = Activity.query.filter_by(year_id=year_id).all()
-        activity_ids = [a.id for a in activities]
+        activities = (
+            db.session.query(
+                Activity.id,
+                Activity.title,
+                Activity.registered_count,
+                Activity.verified_count,
+                Activity.attended_count,
+            )
+            .filter(Activity.year_id == active_year.id)
+            .order_by(Activity.id)
+            .all()
+        )
     else:
         activities = []
-        activity_ids = []
 
-    total_registrants = Registrant.query.filter(Registrant.activity_id.in_(activity_ids)).count() if activity_ids else 0
-    verified = Registrant.query.filter(Registrant.activity_id.in_(activity_ids), Registrant.status == "verified").count() if activity_ids else 0
-    attended = Registrant.query.filter(Registrant.activity_id.in_(activity_ids), Registrant.attended_at.isnot(None)).count() if activity_ids else 0
+    total_registrants = sum(a.registered_count for a in activities)
+    verified = sum(a.verified_count for a in activities)
+    attended = sum(a.attended_count for a in activities)
 
     # Per-activity counts for bar chart
-    activity_labels = []
-    activity_counts = []
-    for a in activities:
-        activity_labels.append(a.title[:20] + ("..." if len(a.title) > 20 else ""))
-        activity_counts.append(a.registrants.count())
+    activity_labels = [a.title[:20] + ("..." if len(a.title) > 20 else "") for a in activities]
+    activity_counts = [a.registered_count for a in activities]
 
-    # Registrations over last 14 days (for line chart)
+    # Registrations over last 14 days (for line chart), read from the daily rollup
     days_back = 14
     today = datetime.utcnow().date()
     start = today - timedelta(days=days_back)
-    if activity_ids:
+    if activities:
         rows = (
-            Registrant.query.filter(
-                Registrant.activity_id.in_(activity_ids),
-                func.date(Registrant.created_at) >= start,
-            )
-            .with_entities(func.date(Registrant.created_at).label("day"), func.count(Registrant.id).label("count"))
-            .group_by(func.date(Registrant.created_at))
-            .order_by(func.date(Registrant.created_at))
+            db.session.query(RegistrationDailyStat.day, func.sum(RegistrationDailyStat.registrations))
+            .join(Activity, Activity.id == RegistrationDailyStat.activity_id)
+            .filter(Activity.year_id == active_year.id, RegistrationDailyStat.day >= start)
+            .group_by(RegistrationDailyStat.day)
             .all()
         )
-        regs_by_day = {str(r.day): r.count for r in rows}
+        regs_by_day = {d.strftime("%Y-%m-%d"): int(n or 0) for d, n in rows}
     else:
         regs_by_day = {}
 
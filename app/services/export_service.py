@@ -0,0 +1,149 @@
+"""Background participant exports, cached on disk per activity data_version."""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from app.models import db, Activity, ExportJob
+from app.services.pdf_export_service import export_registrants_pdf
+from app.services.registrant_service import stream_registrants_for_activity
+
+# A queued or running job older than this belongs to a process that died; a new request starts over
+STALE_AFTER = timedelta(minutes=15)
+
+_ARTIFACT_RE = re.compile(r"^(\d+)-(\d+)\.(\w+)$")
+_RENDERERS = {"pdf": export_registrants_pdf}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """One bounded pool per process, so concurrent export requests queue instead of pinning workers."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get("EXPORT_WORKERS", 2), thread_name_prefix="export"
+            )
+        return _executor
+
+
+def artifact_path(job):
+    return os.path.join(str(current_app.config["EXPORT_FOLDER"]), job.filename)
+
+
+def is_pending(job):
+    return job.status in ("queued", "running")
+
+
+def is_stale(job):
+    return is_pending(job) and job.created_at is not None and job.created_at < datetime.utcnow() - STALE_AFTER
+
+
+def get_export_job_or_404(job_id):
+    return ExportJob.query.get_or_404(job_id)
+
+
+def request_export(activity_id, fmt="pdf", user_id=None):
+    """
+    Return a job for the activity's current data. Finished right away when the file for this
+    data_version already exists; an in-flight job for the same version is reused.
+    """
+    activity = Activity.query.get_or_404(activity_id)
+    version = activity.data_version
+    job = ExportJob(activity_id=activity_id, format=fmt, data_version=version, created_by=user_id)
+    if os.path.isfile(artifact_path(job)):
+        job.status = "done"
+        job.finished_at = datetime.utcnow()
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    in_flight = (
+        ExportJob.query.filter_by(activity_id=activity_id, format=fmt, data_version=version)
+        .filter(ExportJob.status.in_(("queued", "running")), ExportJob.created_at >= datetime.utcnow() - STALE_AFTER)
+        .order_by(ExportJob.id.desc())
+        .first()
+    )
+    if in_flight:
+        return in_flight
+
+    job.status = "queued"
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    _get_executor().submit(_run_in_app, app, job.id)
+    return job
+
+
+def _run_in_app(app, job_id):
+    with app.app_context():
+        try:
+            run_export(job_id)
+        except Exception:
+            app.logger.exception("Export job %s stopped", job_id)
+        finally:
+            db.session.remove()
+
+
+def run_export(job_id):
+    """Render the job's file unless it already exists, then collect files of older versions."""
+    job = db.session.get(ExportJob, job_id)
+    activity = db.session.get(Activity, job.activity_id)
+    # Render the freshest data if registrants changed while the job was queued
+    job.data_version = activity.data_version
+    job.status = "running"
+    db.session.commit()
+
+    path = artifact_path(job)
+    try:
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{job.id}.tmp"
+            with open(tmp, "wb") as out:
+                _RENDERERS[job.format](activity, stream_registrants_for_activity(activity.id), out=out)
+            os.replace(tmp, path)
+        job.status = "done"
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Export job %s failed", job_id)
+        job = db.session.get(ExportJob, job_id)
+        job.status = "failed"
+        job.error = str(e)[:500]
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    collect_exports()
+    return job
+
+
+def collect_exports():
+    """
+    Delete export files that no longer match their activity's data_version (or whose activity is
+    gone), abandoned temp files and finished jobs past EXPORT_JOB_RETENTION_DAYS.
+    Returns (files_removed, jobs_removed).
+    """
+    folder = str(current_app.config["EXPORT_FOLDER"])
+    current = dict(db.session.execute(db.select(Activity.id, Activity.data_version)).all())
+    files_removed = 0
+    if os.path.isdir(folder):
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if name.endswith(".tmp"):
+                stale = os.path.getmtime(path) < time.time() - STALE_AFTER.total_seconds()
+            else:
+                m = _ARTIFACT_RE.match(name)
+                stale = m is not None and current.get(int(m.group(1))) != int(m.group(2))
+            if stale:
+                try:
+                    os.remove(path)
+                    files_removed += 1
+                except FileNotFoundError:
+                    pass  # collected by another worker
+
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config.get("EXPORT_JOB_RETENTION_DAYS", 7))
+    jobs_removed = ExportJob.query.filter(ExportJob.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return files_removed, jobs_removed
@@ -2,13 +2,43 @@
 import os
 import uuid
 from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import func
 from app.models import db, Gallery
+from app.utils.data_version import bump_version
+
+_DERIVATIVE_FORMATS = (
+    ("webp", "WEBP", {"quality": 80, "method": 4}),
+    ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+)
 
 
 def get_gallery_for_activity(activity_id):
     return Gallery.query.filter_by(activity_id=activity_id).order_by(Gallery.created_at.desc()).all()
 
 
+def get_cover_images(activity_ids):
+    """
+    Cover image per activity (newest featured image, else newest image) for all ids in one
+    windowed query. Returns {activity_id: Gallery}; activities without images are absent.
+    """
+    if not activity_ids:
+        return {}
+    ranked = (
+        db.session.query(
+            Gallery.id.label("id"),
+            func.row_number().over(
+                partition_by=Gallery.activity_id,
+                order_by=(Gallery.is_featured.desc(), Gallery.created_at.desc(), Gallery.id.desc()),
+            ).label("rank"),
+        )
+        .filter(Gallery.activity_id.in_(activity_ids))
+        .subquery()
+    )
+    covers = Gallery.query.join(ranked, Gallery.id == ranked.c.id).filter(ranked.c.rank == 1)
+    return {g.activity_id: g for g in covers}
+
+
 def get_featured_photos(limit=8):
     return Gallery.query.filter_by(is_featured=True).order_by(Gallery.created_at.desc()).limit(limit).all()
 
@@ -29,34 +59,90 @@ def save_gallery_image(file_storage):
     folder = current_app.config["GALLERY_UPLOAD_FOLDER"]
     path = os.path.join(str(folder), filename)
     file_storage.save(path)
+    try:
+        _write_derivatives(path)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        # DecompressionBombError (pixel count over Image.MAX_IMAGE_PIXELS) is not an OSError
+        _remove_files(filename)
+        return None
     return filename
 
 
+def _write_derivatives(path):
+    """Write thumb/medium/full copies of the image in WebP and JPEG next to the original."""
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode != "RGB":
+            rgba = im.convert("RGBA")
+            im = Image.new("RGB", rgba.size, (255, 255, 255))
+            im.paste(rgba, mask=rgba.getchannel("A"))
+        for name, max_width in Gallery.VARIANTS:
+            # Width only, so Gallery.variants' srcset widths hold for any aspect ratio
+            if im.width > max_width:
+                resized = im.resize((max_width, max(1, round(im.height * max_width / im.width))), Image.LANCZOS)
+            else:
+                resized = im.copy()
+            for ext, fmt, options in _DERIVATIVE_FORMATS:
+                resized.save(Gallery.variant_name(path, name, ext), fmt, **options)
+
+
+def _image_size(filename):
+    """Display size of a stored upload, honouring the EXIF orientation tag."""
+    path = os.path.join(str(current_app.config["GALLERY_UPLOAD_FOLDER"]), filename)
+    try:
+        with Image.open(path) as im:
+            width, height = im.size
+            if im.getexif().get(0x0112) in (5, 6, 7, 8):
+                width, height = height, width
+            return width, height
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None, None
+
+
+def stored_files(filename):
+    """Names of the upload and every derivative written for it."""
+    return [filename] + [
+        Gallery.variant_name(filename, name, ext) for name, _ in Gallery.VARIANTS for ext, _, _ in _DERIVATIVE_FORMATS
+    ]
+
+
+def _remove_files(filename):
+    """Delete an upload and any derivatives written for it."""
+    folder = str(current_app.config["GALLERY_UPLOAD_FOLDER"])
+    for name in stored_files(filename):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
 def add_gallery_item(year_id, activity_id, file_filename, caption=None, is_featured=False):
+    width, height = _image_size(file_filename)
     item = Gallery(
         year_id=year_id,
         activity_id=activity_id,
         file=file_filename,
         caption=caption or "",
         is_featured=bool(is_featured),
+        width=width,
+        height=height,
     )
     db.session.add(item)
     db.session.commit()
+    bump_version()
     return item
 
 
 def delete_gallery_item(item_id):
     item = Gallery.query.get_or_404(item_id)
-    folder = current_app.config["GALLERY_UPLOAD_FOLDER"]
-    path = os.path.join(str(folder), item.file)
-    if os.path.isfile(path):
-        os.remove(path)
+    _remove_files(item.file)
     db.session.delete(item)
     db.session.commit()
+    bump_version()
 
 
 def set_featured(item_id, is_featured):
     item = Gallery.query.get_or_404(item_id)
     item.is_featured = bool(is_featured)
     db.session.commit()
+    bump_version()
     return item
@@ -0,0 +1,113 @@
+"""Bulk maintenance jobs behind the `flask goslides` commands."""
+import os
+import re
+from flask import current_app
+from sqlalchemy import inspect, select, text
+from app.models import db, Gallery
+from app.models.sponsor import Sponsor
+from app.services.gallery_service import stored_files
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "schema.sql")
+
+_INDEX_RE = re.compile(
+    r"^CREATE\s+(UNIQUE\s+)?INDEX\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]*)\)\s*;",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def schema_indexes(path=SCHEMA_PATH):
+    """(name, table, columns, unique) for every CREATE INDEX statement in schema.sql."""
+    with open(path, encoding="utf-8") as f:
+        sql = f.read()
+    return [
+        (name, table, [c.strip() for c in columns.split(",")], bool(unique))
+        for unique, name, table, columns in _INDEX_RE.findall(sql)
+    ]
+
+
+def ensure_indexes(reindex=False):
+    """
+    Create the schema.sql indexes that are missing and check the columns of those that exist.
+    Returns dict with lists of index names: created, ok, mismatched (columns differ) and
+    skipped (table missing).
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    result = {"created": [], "ok": [], "mismatched": [], "skipped": []}
+    existing_by_table = {}
+    with db.engine.begin() as conn:
+        for name, table, columns, unique in schema_indexes():
+            if table not in tables:
+                result["skipped"].append(name)
+                continue
+            if table not in existing_by_table:
+                existing_by_table[table] = {ix["name"]: ix["column_names"] for ix in inspector.get_indexes(table)}
+            existing = existing_by_table[table]
+            if name not in existing:
+                unique_sql = "UNIQUE " if unique else ""
+                conn.execute(text(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+                result["created"].append(name)
+                continue
+            if existing[name] != columns:
+                result["mismatched"].append(name)
+                continue
+            if reindex:
+                conn.execute(text(f"REINDEX {name}" if conn.dialect.name == "sqlite" else f"REINDEX INDEX {name}"))
+            result["ok"].append(name)
+    return result
+
+
+def database_size():
+    """Size of the database in bytes, or None if the backend cannot tell."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            return conn.exec_driver_sql("PRAGMA page_count").scalar() * conn.exec_driver_sql("PRAGMA page_size").scalar()
+        if conn.dialect.name == "postgresql":
+            return conn.exec_driver_sql("SELECT pg_database_size(current_database())").scalar()
+    return None
+
+
+def vacuum_analyze():
+    """Refresh planner statistics and reclaim free pages. VACUUM cannot run inside a transaction."""
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+            conn.exec_driver_sql("VACUUM")
+        else:
+            conn.exec_driver_sql("VACUUM ANALYZE")
+
+
+def _audit_folder(folder, referenced, required):
+    """(missing, orphans, files_scanned) for one upload folder."""
+    on_disk = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+    missing = sorted(required - on_disk)
+    orphans = sorted(name for name in on_disk - referenced if not name.startswith("."))
+    return missing, orphans, len(on_disk)
+
+
+def check_upload_integrity(remove_orphans=False):
+    """
+    Compare gallery and sponsor upload folders with their tables.
+    missing: rows whose file is gone; orphans: files no row refers to (deleted when
+    remove_orphans). Returns {kind: {"missing", "orphans", "rows", "files"}}.
+    """
+    report = {}
+    checks = (
+        ("gallery", current_app.config["GALLERY_UPLOAD_FOLDER"], Gallery.file, stored_files),
+        ("sponsor", current_app.config["SPONSOR_UPLOAD_FOLDER"], Sponsor.logo, lambda name: [name]),
+    )
+    for kind, folder, column, files_for in checks:
+        folder = str(folder)
+        referenced, required, rows = set(), set(), 0
+        for (name,) in db.session.execute(select(column).execution_options(yield_per=1000)):
+            rows += 1
+            required.add(name)
+            referenced.update(files_for(name))
+        missing, orphans, files = _audit_folder(folder, referenced, required)
+        if remove_orphans:
+            for name in orphans:
+                path = os.path.join(folder, name)
+                if os.path.isfile(path):
+                    os.remove(path)
+        report[kind] = {"missing": missing, "orphans": orphans, "rows": rows, "files": files}
+    return report
@@ -0,0 +1,125 @@
+"""Notification outbox: enqueue inside the caller's transaction, deliver from a separate worker."""
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update
+from app.models import db, NotificationOutbox
+from app.services.whatsapp_service import (
+    SEND_TIMEOUT,
+    provider_name,
+    rate_limiter,
+    registration_confirmation_message,
+    send_whatsapp_message,
+)
+
+
+def enqueue_whatsapp(phone, message):
+    """Add a WhatsApp message to the outbox without committing; None when no phone or provider is configured."""
+    phone = (phone or "").strip()
+    if not phone or not message or provider_name() is None:
+        return None
+    row = NotificationOutbox(channel="whatsapp", recipient=phone, message=message, next_attempt_at=datetime.utcnow())
+    db.session.add(row)
+    return row
+
+
+def enqueue_registration_confirmation(registrant, activity):
+    return enqueue_whatsapp(registrant.phone, registration_confirmation_message(registrant, activity))
+
+
+def _retry_delay(attempts):
+    base = current_app.config.get("OUTBOX_BACKOFF_SECONDS", 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 3600))
+
+
+def _claim(batch_size, lease):
+    """
+    Mark up to batch_size due rows as "sending" until now + lease and commit; return them.
+    Due means pending and past next_attempt_at, or "sending" with an expired lease (the worker
+    died mid-send). One UPDATE ... RETURNING, so concurrent workers never claim the same row;
+    on Postgres SKIP LOCKED also keeps them from waiting on each other.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(NotificationOutbox.id)
+        .where(
+            NotificationOutbox.status.in_(("pending", "sending")),
+            NotificationOutbox.next_attempt_at <= now,
+        )
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    claimed = db.session.execute(
+        update(NotificationOutbox)
+        .where(
+            NotificationOutbox.id.in_(due),
+            NotificationOutbox.status.in_(("pending", "sending")),
+            NotificationOutbox.next_attempt_at <= now,
+        )
+        .values(status="sending", next_attempt_at=now + lease, attempts=NotificationOutbox.attempts + 1)
+        .returning(NotificationOutbox.id, NotificationOutbox.recipient, NotificationOutbox.message, NotificationOutbox.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return sorted(claimed)
+
+
+def process_outbox(batch_size=50):
+    """
+    Send one batch of due messages; return counts of sent, retried and dead-lettered rows.
+    Rows are claimed and committed before any send, and each result is committed right after its
+    send, so no lock or transaction is held across HTTP calls and a crash re-sends at most the
+    message in flight (once its lease expires).
+    """
+    max_attempts = current_app.config.get("OUTBOX_MAX_ATTEMPTS", 6)
+    limiter = rate_limiter(provider_name())
+    # Long enough for every claimed row to be sent, rate-limited, even if each send times out
+    lease = timedelta(seconds=batch_size * (SEND_TIMEOUT + 1 / limiter.rate) + 60)
+    counts = {"sent": 0, "retry": 0, "dead": 0}
+    for row_id, recipient, message, attempts in _claim(batch_size, lease):
+        limiter.acquire()
+        now = datetime.utcnow()
+        if send_whatsapp_message(recipient, message):
+            values = {"status": "sent", "sent_at": now, "last_error": None}
+            counts["sent"] += 1
+        elif attempts >= max_attempts:
+            values = {"status": "dead", "last_error": f"gave up after {attempts} attempts"}
+            counts["dead"] += 1
+        else:
+            values = {
+                "status": "pending",
+                "next_attempt_at": now + _retry_delay(attempts),
+                "last_error": f"attempt {attempts} failed",
+            }
+            counts["retry"] += 1
+        db.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == row_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return counts
+
+
+def run_outbox_worker(batch_size=50, interval=2.0, once=False, echo=print):
+    """
+    Drain the outbox and send broadcasts (on their own threads, picking up queued and abandoned
+    ones each round); with once=True stop when nothing is due and the broadcasts have finished,
+    otherwise poll every `interval` seconds.
+    """
+    from app.services.broadcast_service import dispatch_broadcasts, wait_for_broadcasts
+
+    while True:
+        for broadcast_id in dispatch_broadcasts():
+            echo(f"broadcast {broadcast_id} started")
+        counts = process_outbox(batch_size)
+        if any(counts.values()):
+            echo(f"sent={counts['sent']} retry={counts['retry']} dead={counts['dead']}")
+            continue
+        if once:
+            wait_for_broadcasts()
+            return
+        time.sleep(interval)
@@ -1,40 +1,52 @@
 """PDF export for participant/registrant lists."""
-import io
+import tempfile
+from itertools import islice
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
+HEADER = ["#", "Name", "School", "Email", "Phone", "Status", "Attended"]
+COL_WIDTHS = [1.2 * cm, 3.5 * cm, 3.5 * cm, 4 * cm, 3 * cm, 1.8 * cm, 1.5 * cm]
+HEADER_HEIGHT = 18
+ROW_HEIGHT = 14
+# Fixed row heights make a chunk of this size fill one A4 page (26.7cm of frame), so Platypus
+# lays out page-sized tables instead of repeatedly splitting one table of every row.
+ROWS_PER_PAGE = 51
 
-def export_registrants_pdf(activity, registrants):
-    """Generate PDF buffer with participant list for the activity."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=1.5 * cm,
-        leftMargin=1.5 * cm,
-        topMargin=1.5 * cm,
-        bottomMargin=1.5 * cm,
-    )
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=16,
-        spaceAfter=6,
-    )
-    story = []
-    story.append(Paragraph("Go Slides – Participant List", title_style))
-    story.append(Paragraph(activity.title, styles["Heading2"]))
-    story.append(Spacer(1, 0.5 * cm))
-    story.append(Paragraph(f"Activity date: {activity.date.strftime('%d %B %Y') if activity.date else 'TBA'}", styles["Normal"]))
-    story.append(Spacer(1, 0.8 * cm))
+_styles = None
+
+
+def _get_styles():
+    """Paragraph and table styles, built once per process."""
+    global _styles
+    if _styles is None:
+        sample = getSampleStyleSheet()
+        _styles = {
+            "title": ParagraphStyle("CustomTitle", parent=sample["Heading1"], fontSize=16, spaceAfter=6),
+            "heading": sample["Heading2"],
+            "normal": sample["Normal"],
+            "table": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1BA3A8")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 9),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.white),
+                ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F5F7FA")]),
+            ]),
+        }
+    return _styles
 
-    data = [["#", "Name", "School", "Email", "Phone", "Status", "Attended"]]
+
+def _rows(registrants):
     for i, r in enumerate(registrants, 1):
-        data.append([
+        yield [
             str(i),
             r.name or "",
             r.school or "",
@@ -42,25 +54,50 @@ def export_registrants_pdf(activity, registrants):
             r.phone or "",
             r.status or "",
             "Yes" if r.attended_at else "No",
-        ])
+        ]
+
+
+def _tables(registrants, first_page_rows):
+    """One Table per page, each with its own header row."""
+    styles = _get_styles()
+    rows = _rows(registrants)
+    size = first_page_rows
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        t = Table([HEADER] + chunk, colWidths=COL_WIDTHS, rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * len(chunk))
+        t.setStyle(styles["table"])
+        yield t
+        size = ROWS_PER_PAGE
+
 
-    t = Table(data, colWidths=[1.2 * cm, 3.5 * cm, 3.5 * cm, 4 * cm, 3 * cm, 1.8 * cm, 1.5 * cm])
-    t.setStyle(
-        TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1BA3A8")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 9),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.white),
-            ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
-            ("FONTSIZE", (0, 1), (-1, -1), 8),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F5F7FA")]),
-        ])
+def export_registrants_pdf(activity, registrants, out=None):
+    """
+    Generate the participant list PDF for the activity.
+    registrants may be any iterable (e.g. a streaming query). Writes into out (an open binary
+    file) or, by default, a temporary file that is deleted when closed; returns it positioned
+    at the start.
+    """
+    if out is None:
+        out = tempfile.TemporaryFile(suffix=".pdf")
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        rightMargin=1.5 * cm,
+        leftMargin=1.5 * cm,
+        topMargin=1.5 * cm,
+        bottomMargin=1.5 * cm,
     )
-    story.append(t)
+    styles = _get_styles()
+    story = []
+    story.append(Paragraph("Go Slides – Participant List", styles["title"]))
+    story.append(Paragraph(activity.title, styles["heading"]))
+    story.append(Spacer(1, 0.5 * cm))
+    story.append(Paragraph(f"Activity date: {activity.date.strftime('%d %B %Y') if activity.date else 'TBA'}", styles["normal"]))
+    story.append(Spacer(1, 0.8 * cm))
+    # The title block takes the space of about seven rows on the first page
+    story.extend(_tables(registrants, first_page_rows=ROWS_PER_PAGE - 7))
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    out.seek(0)
+    return out
@@ -0,0 +1,74 @@
+"""QR code rendering for check-in codes, cached in memory and on disk."""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import qrcode
+import qrcode.image.svg
+from flask import current_app
+
+_FORMATS = {
+    "png": None,
+    "svg": qrcode.image.svg.SvgPathImage,
+}
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cache_key(code, url):
+    """Check-in code plus a short digest of the encoded URL (host may differ per deployment)."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return f"{code}-{digest}"
+
+
+def _render(url, fmt):
+    img = qrcode.make(url, image_factory=_FORMATS[fmt])
+    if fmt == "svg":
+        return img.to_string(encoding="unicode").encode("utf-8")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _remember(key, value):
+    limit = current_app.config.get("QR_MEMORY_CACHE_SIZE", 2048)
+    with _memory_lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > limit:
+            _memory.popitem(last=False)
+
+
+def get_qr(code, url, fmt="png"):
+    """Return (bytes, etag) for the QR image encoding url, rendering at most once per code."""
+    key = (_cache_key(code, url), fmt)
+    with _memory_lock:
+        hit = _memory.get(key)
+        if hit is not None:
+            _memory.move_to_end(key)
+            return hit
+
+    folder = str(current_app.config["QR_CACHE_FOLDER"])
+    path = os.path.join(folder, f"{key[0]}.{fmt}")
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        data = _render(url, fmt)
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    value = (data, f"{key[0]}-{fmt}")
+    _remember(key, value)
+    return value
+
+
+def get_qr_svgs(items):
+    """Inline SVG markup for a page of (code, url) pairs, keyed by code."""
+    return {code: get_qr(code, url, "svg")[0].decode("utf-8") for code, url in items}
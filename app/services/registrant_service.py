@@ -1,8 +1,13 @@
 """Registrant service."""
 import secrets
-from datetime import datetime
-from app.models import db, Registrant
-from app.services.activity_service import check_quota_and_close
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models import db, Activity, Registrant
+from app.services.activity_service import reserve_seat
+from app.services.dashboard_service import bump_daily_stats
+from app.services.notification_service import enqueue_registration_confirmation
+from app.utils.data_version import bump_version
 
 
 def _generate_check_in_code():
@@ -10,6 +15,18 @@ def _generate_check_in_code():
     return secrets.token_urlsafe(12)
 
 
+def _adjust_counters(activity_id, registered=0, verified=0, attended=0):
+    """Apply counter deltas to the activity and bump its data_version inside the current transaction."""
+    values = {Activity.data_version: Activity.data_version + 1}
+    if registered:
+        values[Activity.registered_count] = Activity.registered_count + registered
+    if verified:
+        values[Activity.verified_count] = Activity.verified_count + verified
+    if attended:
+        values[Activity.attended_count] = Activity.attended_count + attended
+    Activity.query.filter_by(id=activity_id).update(values, synchronize_session=False)
+
+
 def get_registrants_for_activity(activity_id, status=None):
     q = Registrant.query.filter_by(activity_id=activity_id)
     if status:
@@ -17,10 +34,82 @@ def get_registrants_for_activity(activity_id, status=None):
     return q.order_by(Registrant.created_at.desc()).all()
 
 
+def filter_registrants(query, search=None, status=None, attended=None, date_from=None, date_to=None):
+    """
+    Narrow a registrant query. search matches name, school, email or phone (case-insensitive
+    substring); attended is True/False/None; date_from and date_to are dates compared against
+    the registration day, both inclusive.
+    """
+    if search:
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.filter(or_(*[
+            column.ilike(pattern, escape="\\")
+            for column in (Registrant.name, Registrant.school, Registrant.email, Registrant.phone)
+        ]))
+    if status:
+        query = query.filter(Registrant.status == status)
+    if attended is True:
+        query = query.filter(Registrant.attended_at.isnot(None))
+    elif attended is False:
+        query = query.filter(Registrant.attended_at.is_(None))
+    if date_from:
+        query = query.filter(Registrant.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        query = query.filter(Registrant.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    return query
+
+
+def stream_registrants_for_activity(activity_id, batch_size=500, **filters):
+    """
+    Same order as get_registrants_for_activity, fetched in batches instead of one list
+    (a server-side cursor on Postgres). Accepts the filter_registrants keywords.
+    """
+    query = filter_registrants(Registrant.query.filter_by(activity_id=activity_id), **filters)
+    return query.order_by(Registrant.created_at.desc(), Registrant.id.desc()).yield_per(batch_size)
+
+
+def get_registrants_page(activity_id, after=None, before=None, per_page=50, **filters):
+    """
+    One page of registrants, newest first, using keyset pagination on (created_at, id) so every
+    page costs the same regardless of depth. after/before are (created_at, id) of the last/first
+    row of the current page. Accepts the filter_registrants keywords.
+    Returns (registrants, has_prev, has_next).
+    """
+    query = filter_registrants(Registrant.query.filter_by(activity_id=activity_id), **filters)
+    if before:
+        created_at, reg_id = before
+        query = query.filter(or_(
+            Registrant.created_at > created_at,
+            and_(Registrant.created_at == created_at, Registrant.id > reg_id),
+        )).order_by(Registrant.created_at.asc(), Registrant.id.asc())
+    else:
+        if after:
+            created_at, reg_id = after
+            query = query.filter(or_(
+                Registrant.created_at < created_at,
+                and_(Registrant.created_at == created_at, Registrant.id < reg_id),
+            ))
+        query = query.order_by(Registrant.created_at.desc(), Registrant.id.desc())
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        return list(reversed(rows)), more, True
+    return rows, after is not None, more
+
+
 def create_registrant(activity_id, name, school, phone, email):
+    """
+    Reserve a seat, insert the registrant and queue its WhatsApp confirmation in one transaction.
+    Returns None if registration is closed or full.
+    """
     code = _generate_check_in_code()
     while Registrant.query.filter_by(check_in_code=code).first():
         code = _generate_check_in_code()
+    status = reserve_seat(activity_id)
+    if status is None:
+        db.session.rollback()
+        return None
     reg = Registrant(
         activity_id=activity_id,
         name=name,
@@ -31,15 +120,26 @@ def create_registrant(activity_id, name, school, phone, email):
         check_in_code=code,
     )
     db.session.add(reg)
+    bump_daily_stats(activity_id, registrations=1)
+    enqueue_registration_confirmation(reg, db.session.get(Activity, activity_id))
     db.session.commit()
-    activity = reg.activity
-    check_quota_and_close(activity)
+    # Cached public pages change only when the last seat closes registration; the seat count on the
+    # detail page may lag by up to PAGE_CACHE_TTL, so a registration rush keeps its cache
+    if status == "closed":
+        bump_version()
     return reg
 
 
 def set_registrant_status(registrant_id, status):
     reg = Registrant.query.get_or_404(registrant_id)
-    reg.status = status
+    if reg.status != status:
+        if status == "verified":
+            _adjust_counters(reg.activity_id, verified=1)
+        elif reg.status == "verified":
+            _adjust_counters(reg.activity_id, verified=-1)
+        else:
+            _adjust_counters(reg.activity_id)
+        reg.status = status
     db.session.commit()
     return reg
 
@@ -57,6 +157,8 @@ def mark_attended(registrant_id):
     if reg.attended_at:
         return reg
     reg.attended_at = datetime.utcnow()
+    _adjust_counters(reg.activity_id, attended=1)
+    bump_daily_stats(reg.activity_id, attendances=1, day=reg.attended_at.date())
     db.session.commit()
     return reg
 
@@ -68,12 +170,118 @@ def mark_attended_by_code(code):
     if reg.attended_at:
         return reg
     reg.attended_at = datetime.utcnow()
+    _adjust_counters(reg.activity_id, attended=1)
+    bump_daily_stats(reg.activity_id, attendances=1, day=reg.attended_at.date())
     db.session.commit()
     return reg
 
 
+def _parse_scanned_at(value, now):
+    """Naive UTC datetime from an ISO 8601 string; now when missing, invalid or in the future."""
+    try:
+        scanned_at = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return now
+    if scanned_at.tzinfo is not None:
+        scanned_at = scanned_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(scanned_at, now)
+
+
+def apply_checkins(scans):
+    """
+    Mark attendance for a batch of {"code", "scanned_at"} scans in one transaction.
+    Idempotent: a code that is already checked in (earlier in the batch, by a previous sync or
+    by another device at the same moment) reports "already" with the stored time.
+    Returns one result dict per scan, in order.
+    """
+    now = datetime.utcnow()
+    codes = {str(scan.get("code") or "").strip() for scan in scans} - {""}
+    found = {
+        reg.check_in_code: reg
+        for reg in Registrant.query.filter(Registrant.check_in_code.in_(codes))
+    } if codes else {}
+
+    results = []
+    checked_in = {}  # (activity_id, day) -> count
+    for scan in scans:
+        code = str(scan.get("code") or "").strip()
+        reg = found.get(code)
+        if reg is None:
+            results.append({"code": code, "status": "not_found"})
+            continue
+        status = "already"
+        if reg.attended_at is None:
+            scanned_at = _parse_scanned_at(scan.get("scanned_at"), now)
+            # Conditional per row so a concurrent sync of the same code cannot count it twice
+            result = db.session.execute(
+                update(Registrant)
+                .where(Registrant.id == reg.id, Registrant.attended_at.is_(None))
+                .values(attended_at=scanned_at)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                status = "checked_in"
+                set_committed_value(reg, "attended_at", scanned_at)
+                key = (reg.activity_id, scanned_at.date())
+                checked_in[key] = checked_in.get(key, 0) + 1
+            else:
+                db.session.refresh(reg, ["attended_at"])
+        results.append({
+            "code": code,
+            "status": status,
+            "registrant_id": reg.id,
+            "name": reg.name,
+            "school": reg.school,
+            "activity_id": reg.activity_id,
+            "attended_at": reg.attended_at.isoformat() + "Z" if reg.attended_at else None,
+        })
+
+    per_activity = {}
+    for (activity_id, day), n in checked_in.items():
+        bump_daily_stats(activity_id, attendances=n, day=day)
+        per_activity[activity_id] = per_activity.get(activity_id, 0) + n
+    for activity_id, n in per_activity.items():
+        _adjust_counters(activity_id, attended=n)
+    db.session.commit()
+    return results
+
+
+# action: (values to set, condition for rows that actually change, counter deltas per changed row)
+BULK_ACTIONS = {
+    "verify": (lambda now: {"status": "verified"}, Registrant.status != "verified", {"verified": 1}),
+    "pending": (lambda now: {"status": "pending"}, Registrant.status == "verified", {"verified": -1}),
+    "attend": (lambda now: {"attended_at": now}, Registrant.attended_at.is_(None), {"attended": 1}),
+}
+
+
+def bulk_update_registrants(activity_id, registrant_ids, action, batch_size=500):
+    """
+    Apply a BULK_ACTIONS action to the given registrants of the activity with one UPDATE per
+    batch; counters and the daily rollup are adjusted from the rows actually changed, and each
+    batch commits on its own. Returns the number of registrants changed.
+    """
+    values, needs_change, deltas = BULK_ACTIONS[action]
+    ids = sorted(set(registrant_ids))
+    changed = 0
+    for start in range(0, len(ids), batch_size):
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(Registrant)
+            .where(Registrant.activity_id == activity_id, Registrant.id.in_(ids[start:start + batch_size]), needs_change)
+            .values(**values(now))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            _adjust_counters(activity_id, **{k: v * result.rowcount for k, v in deltas.items()})
+            if action == "attend":
+                bump_daily_stats(activity_id, attendances=result.rowcount, day=now.date())
+        db.session.commit()
+        changed += result.rowcount
+    return changed
+
+
 def ensure_check_in_code(reg):
-    """Backfill check_in_code for registrants created before Phase 3."""
+    """Give one registrant created before Phase 3 a check-in code (see backfill_check_in_codes for all)."""
     if reg.check_in_code:
         return reg.check_in_code
     code = _generate_check_in_code()
@@ -82,3 +290,40 @@ def ensure_check_in_code(reg):
     reg.check_in_code = code
     db.session.commit()
     return code
+
+
+def backfill_check_in_codes(batch_size=500):
+    """
+    Give every registrant without a check-in code a unique one, one transaction per batch.
+    Collisions are checked with a single query per batch. Returns the number of rows updated.
+    """
+    updated = 0
+    while True:
+        rows = db.session.execute(
+            select(Registrant.id, Registrant.activity_id)
+            .where(Registrant.check_in_code.is_(None))
+            .order_by(Registrant.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        codes = {reg_id: _generate_check_in_code() for reg_id, _ in rows}
+        while True:
+            taken = set(db.session.scalars(select(Registrant.check_in_code).where(Registrant.check_in_code.in_(codes.values()))))
+            duplicates = len(codes) - len(set(codes.values()))
+            if not taken and not duplicates:
+                break
+            seen = set()
+            for reg_id, code in codes.items():
+                if code in taken or code in seen:
+                    codes[reg_id] = _generate_check_in_code()
+                seen.add(codes[reg_id])
+        db.session.execute(update(Registrant), [{"id": reg_id, "check_in_code": code} for reg_id, code in codes.items()])
+        # Codes appear in CSV/XLSX exports
+        db.session.execute(
+            update(Activity)
+            .where(Activity.id.in_({activity_id for _, activity_id in rows}))
+            .values(data_version=Activity.data_version + 1)
+        )
+        db.session.commit()
+        updated += len(rows)
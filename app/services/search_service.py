@@ -0,0 +1,167 @@
+"""
+Ranked full-text search over registrants, activities and contact messages.
+SQLite: FTS5 external-content tables kept in sync by triggers.
+Postgres: generated tsvector columns with GIN indexes.
+Other backends fall back to unranked ILIKE.
+"""
+import re
+from flask import current_app
+from sqlalchemy import or_, text
+from sqlalchemy.orm import joinedload
+from app.models import db, Activity, ContactMessage, Registrant
+
+# kind: (model, table, indexed columns with Postgres weights)
+INDEXES = {
+    "registrants": (Registrant, "registrants", (("name", "A"), ("school", "B"), ("email", "B"), ("phone", "C"))),
+    "activities": (Activity, "activities", (("title", "A"), ("description", "B"))),
+    "messages": (ContactMessage, "contact_messages", (("name", "A"), ("email", "B"), ("message", "C"))),
+}
+
+# Relationships the result templates show
+_EAGER = {"registrants": ("activity",), "activities": ("year",), "messages": ()}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(query):
+    return _WORD_RE.findall((query or "").lower())[:10]
+
+
+def _sqlite_statements(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        # Only indexed columns: counter and status updates must not touch the index
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def _postgres_statements(table, weighted):
+    vector = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({c}, '')), '{w}')" for c, w in weighted
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_search ON {table} USING GIN (search_vector)",
+    ]
+
+
+def _index_exists(conn, table):
+    if conn.dialect.name == "sqlite":
+        return conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (f"{table}_fts",)
+        ).first() is not None
+    if conn.dialect.name == "postgresql":
+        return conn.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = :t AND column_name = 'search_vector'"
+            ),
+            {"t": table},
+        ).first() is not None
+    return True
+
+
+def missing_search_indexes():
+    """Kinds whose index structures do not exist yet; catalog reads only, safe at startup."""
+    with db.engine.connect() as conn:
+        return [kind for kind, (_, table, _) in INDEXES.items() if not _index_exists(conn, table)]
+
+
+def ensure_search_index(rebuild=False):
+    """
+    Create the search index structures that are missing (cheap catalog checks otherwise).
+    A newly created or rebuilt SQLite index is filled from its table. Returns the kinds set up.
+    Run from `flask goslides search-index`, not at startup: on Postgres adding the generated
+    column rewrites the table under an exclusive lock, and a SQLite rebuild holds the write lock.
+    """
+    created = []
+    with db.engine.begin() as conn:
+        dialect = conn.dialect.name
+        for kind, (_, table, weighted) in INDEXES.items():
+            columns = [c for c, _ in weighted]
+            exists = _index_exists(conn, table)
+            if dialect == "sqlite":
+                if not exists:
+                    for statement in _sqlite_statements(table, columns):
+                        conn.exec_driver_sql(statement)
+                if rebuild or not exists:
+                    conn.exec_driver_sql(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+                    created.append(kind)
+            elif dialect == "postgresql" and not exists:
+                for statement in _postgres_statements(table, weighted):
+                    conn.exec_driver_sql(statement)
+                created.append(kind)
+    return created
+
+
+def _fts_query(terms):
+    # Every word must match, each as a prefix; quoting keeps FTS5 operators out of user input
+    return " AND ".join(f'"{t}"*' for t in terms)
+
+
+def _ranked_ids(kind, terms, limit, offset, activity_id=None):
+    model, table, weighted = INDEXES[kind]
+    dialect = db.session.get_bind().dialect.name
+    scope = ""
+    params = {"limit": limit, "offset": offset}
+    if activity_id is not None and kind == "registrants":
+        scope = " AND t.activity_id = :activity_id"
+        params["activity_id"] = activity_id
+    if dialect == "sqlite":
+        params["q"] = _fts_query(terms)
+        sql = (
+            f"SELECT f.rowid FROM {table}_fts f JOIN {table} t ON t.id = f.rowid "
+            f"WHERE {table}_fts MATCH :q{scope} ORDER BY bm25({table}_fts), f.rowid DESC "
+            f"LIMIT :limit OFFSET :offset"
+        )
+    elif dialect == "postgresql":
+        params["q"] = " & ".join(f"{t}:*" for t in terms)
+        sql = (
+            f"SELECT t.id FROM {table} t, to_tsquery('simple', :q) q "
+            f"WHERE t.search_vector @@ q{scope} ORDER BY ts_rank(t.search_vector, q) DESC, t.id DESC "
+            f"LIMIT :limit OFFSET :offset"
+        )
+    else:
+        columns = [getattr(model, c) for c, _ in weighted]
+        query = db.session.query(model.id)
+        for t in terms:
+            query = query.filter(or_(*[c.ilike(f"%{t}%") for c in columns]))
+        if scope:
+            query = query.filter(model.activity_id == activity_id)
+        return [row[0] for row in query.order_by(model.id.desc()).limit(limit).offset(offset)]
+    return [row[0] for row in db.session.execute(text(sql), params)]
+
+
+def search(kind, query, page=1, per_page=20, activity_id=None):
+    """
+    Ranked matches of every word of query (as prefixes) in the kind's indexed columns.
+    activity_id narrows registrant results. Returns (objects in rank order, has_next).
+    """
+    terms = _terms(query)
+    if kind not in INDEXES or not terms:
+        return [], False
+    page = max(page, 1)
+    try:
+        ids = _ranked_ids(kind, terms, per_page + 1, (page - 1) * per_page, activity_id)
+    except Exception:
+        # Index missing (`flask goslides search-index` not run yet): fail soft with no results
+        db.session.rollback()
+        current_app.logger.exception("Search on %s failed", kind)
+        return [], False
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+    model = INDEXES[kind][0]
+    query = model.query.options(*[joinedload(getattr(model, rel)) for rel in _EAGER[kind]]).filter(model.id.in_(ids))
+    by_id = {obj.id: obj for obj in query} if ids else {}
+    return [by_id[i] for i in ids if i in by_id], has_next
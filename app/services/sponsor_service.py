@@ -1,19 +1,23 @@
+from sqlalchemy import select
 from app.models.sponsor import Sponsor
 from app.models import db
+from app.utils.data_version import bump_version
+from app.utils.site_cache import get_cached
 
 class SponsorService:
     @staticmethod
     def get_all(year_id=None):
-        q = Sponsor.query
+        q = select(Sponsor)
         if year_id:
             q = q.filter_by(year_id=year_id)
-        return q.order_by(Sponsor.created_at.desc()).all()
+        return get_cached(f"sponsors:{year_id}", q.order_by(Sponsor.created_at.desc()), many=True)
 
     @staticmethod
     def add(name, logo, year_id, link=None):
         sponsor = Sponsor(name=name, logo=logo, link=link, year_id=year_id)
         db.session.add(sponsor)
         db.session.commit()
+        bump_version("data", "site")
         return sponsor
 
     @staticmethod
@@ -26,6 +30,7 @@ class SponsorService:
         if year_id:
             sponsor.year_id = year_id
         db.session.commit()
+        bump_version("data", "site")
         return sponsor
 
     @staticmethod
@@ -33,3 +38,4 @@ class SponsorService:
         sponsor = Sponsor.query.get_or_404(sponsor_id)
         db.session.delete(sponsor)
         db.session.commit()
+        bump_version("data", "site")
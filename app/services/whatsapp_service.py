@@ -1,7 +1,105 @@
 """WhatsApp notification integration (Twilio-compatible or generic webhook)."""
 import os
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models import db, SendRateLimit
+
+# Seconds a provider call may take before it counts as failed
+SEND_TIMEOUT = 10
+
+
+def provider_name():
+    """Which provider send_whatsapp_message would use: "twilio", "webhook" or None."""
+    if os.environ.get("TWILIO_ACCOUNT_SID") and os.environ.get("TWILIO_AUTH_TOKEN"):
+        return "twilio"
+    if os.environ.get("WHATSAPP_WEBHOOK_URL"):
+        return "webhook"
+    return None
+
+
+class RateLimiter:
+    """
+    Token bucket for one provider account: at most `rate` messages per second across every
+    process and thread that sends through it (outbox workers, broadcasts). The bucket lives in
+    the send_rate_limits table and a token is taken with one conditional UPDATE, so concurrent
+    senders never share a token.
+    """
+
+    def __init__(self, name, rate, burst=None):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+
+    def _level(self, now):
+        refilled = SendRateLimit.tokens + (now - SendRateLimit.updated_at) * self.rate
+        return case((refilled > self.capacity, self.capacity), else_=refilled)
+
+    def _take(self, now):
+        """Take a token; return 0 on success, else the seconds until one is due."""
+        with db.engine.begin() as conn:
+            taken = conn.execute(
+                update(SendRateLimit)
+                .where(SendRateLimit.name == self.name, self._level(now) >= 1)
+                .values(tokens=self._level(now) - 1, updated_at=now)
+            ).rowcount
+            if taken:
+                return 0
+            row = conn.execute(
+                select(SendRateLimit.tokens, SendRateLimit.updated_at).where(SendRateLimit.name == self.name)
+            ).first()
+            if row is None:
+                conn.execute(insert(SendRateLimit).values(name=self.name, tokens=self.capacity - 1, updated_at=now))
+                return 0
+        tokens = min(self.capacity, row.tokens + (now - row.updated_at) * self.rate)
+        return max((1 - tokens) / self.rate, 0.001)
+
+    def acquire(self):
+        while True:
+            try:
+                wait = self._take(time.time())
+            except IntegrityError:
+                # Another process created the bucket at the same moment
+                continue
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def _http_session():
+    """Process-wide pooled HTTP session so concurrent sends reuse keep-alive connections."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http = session
+        return _http
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(provider):
+    """Limiter for a provider, sized by WHATSAPP_RATE_LIMIT (messages/second) and shared across processes."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(
+                f"whatsapp:{provider}", current_app.config.get("WHATSAPP_RATE_LIMIT", 10)
+            )
+        return limiter
 
 
 def send_whatsapp_message(phone: str, message: str) -> bool:
@@ -24,11 +122,11 @@ def send_whatsapp_message(phone: str, message: str) -> bool:
     if sid and token:
         try:
             to = f"whatsapp:{phone}" if not phone.startswith("whatsapp:") else phone
-            r = requests.post(
+            r = _http_session().post(
                 f"https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json",
                 auth=(sid, token),
                 data={"From": from_num, "To": to, "Body": message},
-                timeout=10,
+                timeout=SEND_TIMEOUT,
             )
             if r.status_code in (200, 201):
                 return True
@@ -41,10 +139,10 @@ def send_whatsapp_message(phone: str, message: str) -> bool:
     webhook = os.environ.get("WHATSAPP_WEBHOOK_URL")
     if webhook:
         try:
-            r = requests.post(
+            r = _http_session().post(
                 webhook,
                 json={"phone": phone, "message": message},
-                timeout=10,
+                timeout=SEND_TIMEOUT,
             )
             if r.status_code in (200, 201, 204):
                 return True
@@ -56,13 +154,8 @@ def send_whatsapp_message(phone: str, message: str) -> bool:
     return False
 
 
-def notify_registration_confirmation(registrant, activity):
-    """Send WhatsApp to registrant after registration (if phone and integration configured)."""
-    phone = (registrant.phone or "").strip()
-    if not phone:
-        return False
-    message = (
+def registration_confirmation_message(registrant, activity):
+    return (
         f"Hi {registrant.name}! You have registered for *{activity.title}* (Go Slides). "
         "We will verify your registration shortly."
     )
-    return send_whatsapp_message(phone, message)
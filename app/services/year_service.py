@@ -1,9 +1,12 @@
 """Year management service."""
+from sqlalchemy import select
 from app.models import db, Year
+from app.utils.data_version import bump_version
+from app.utils.site_cache import get_cached
 
 
 def get_active_year():
-    return Year.query.filter_by(active=True).first()
+    return get_cached("active_year", select(Year).filter_by(active=True).limit(1))
 
 
 def get_all_years():
@@ -17,6 +20,7 @@ def set_active_year(year_id):
     if year:
         year.active = True
     db.session.commit()
+    bump_version("data", "site")
     return year
 
 
@@ -26,6 +30,7 @@ def create_year(name):
     year = Year(name=name, active=active)
     db.session.add(year)
     db.session.commit()
+    bump_version("data", "site")
     return year
 
 def create_year(name, theme=None):
@@ -34,6 +39,7 @@ def create_year(name, theme=None):
     year = Year(name=name, theme=theme, active=active)
     db.session.add(year)
     db.session.commit()
+    bump_version("data", "site")
     return year
 
 
@@ -41,6 +47,7 @@ def update_year(year_id, name):
     year = Year.query.get_or_404(year_id)
     year.name = name
     db.session.commit()
+    bump_version("data", "site")
     return year
 
 def update_year(year_id, name, theme=None):
@@ -48,6 +55,7 @@ def update_year(year_id, name, theme=None):
     year.name = name
     year.theme = theme
     db.session.commit()
+    bump_version("data", "site")
     return year
 
 
@@ -55,3 +63,4 @@ def delete_year(year_id):
     year = Year.query.get_or_404(year_id)
     db.session.delete(year)
     db.session.commit()
+    bump_version("data", "site")
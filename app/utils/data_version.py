@@ -0,0 +1,32 @@
+"""Cross-worker data-version stamps: one tiny file per name, bumped after writes that change public content."""
+import os
+import threading
+import time
+
+from flask import current_app
+
+
+def _path(name):
+    return os.path.join(str(current_app.config["DATA_VERSION_FOLDER"]), name)
+
+
+def get_version(name="data"):
+    """Current stamp for name ("0" until the first bump). A single small file read, shared by all workers."""
+    try:
+        with open(_path(name)) as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_version(*names):
+    """Record that data behind each name (default "data") changed; every worker sees it on its next check."""
+    folder = str(current_app.config["DATA_VERSION_FOLDER"])
+    os.makedirs(folder, exist_ok=True)
+    stamp = str(time.time_ns())
+    for name in names or ("data",):
+        tmp = f"{_path(name)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(stamp)
+        os.replace(tmp, _path(name))
+    return stamp
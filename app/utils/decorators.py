@@ -1,6 +1,7 @@
 """Role-based access decorators."""
+import hmac
 from functools import wraps
-from flask import flash, redirect, url_for
+from flask import current_app, flash, jsonify, redirect, request, url_for
 from flask_login import current_user
 
 from app.models import ROLE_SUPER_ADMIN, ROLE_OPERATOR
@@ -29,3 +30,20 @@ def super_admin_required(f):
 def operator_or_above(f):
     """Allow both Operator and Super Admin (default for most admin routes)."""
     return role_required(ROLE_SUPER_ADMIN, ROLE_OPERATOR)(f)
+
+
+def checkin_api_auth(f):
+    """
+    Allow scanner devices sending `Authorization: Bearer <CHECKIN_API_TOKEN>` and logged-in
+    operators (the admin scanner page). Answers 401 JSON instead of redirecting.
+    """
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        token = current_app.config.get("CHECKIN_API_TOKEN")
+        auth = request.headers.get("Authorization", "")
+        if token and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].strip(), token):
+            return f(*args, **kwargs)
+        if current_user.is_authenticated and current_user.role in (ROLE_SUPER_ADMIN, ROLE_OPERATOR):
+            return f(*args, **kwargs)
+        return jsonify(error="unauthorized"), 401
+    return wrapped
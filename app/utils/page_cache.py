@@ -0,0 +1,109 @@
+"""Rendered-response cache for anonymous public pages, shared across workers through a SQLite file."""
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+from app.utils.data_version import get_version
+
+_local = threading.local()
+
+
+def _connection():
+    path = str(current_app.config["PAGE_CACHE_PATH"])
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=1, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_cache ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, status INTEGER NOT NULL, "
+            "content_type TEXT NOT NULL, body BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_created ON page_cache (created_at)")
+        connections[path] = conn
+    return conn
+
+
+def _get(key, version):
+    ttl = current_app.config.get("PAGE_CACHE_TTL", 300)
+    return _connection().execute(
+        "SELECT status, content_type, body FROM page_cache WHERE key = ? AND version = ? AND created_at > ?",
+        (key, version, time.time() - ttl),
+    ).fetchone()
+
+
+def _put(key, version, response):
+    conn = _connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO page_cache (key, version, status, content_type, body, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (key, version, response.status_code, response.content_type, response.get_data(), time.time()),
+    )
+    # Rows of older versions are dead; past the cap the oldest rows go first
+    conn.execute(
+        "DELETE FROM page_cache WHERE version != ? OR key IN "
+        "(SELECT key FROM page_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+        (version, current_app.config.get("PAGE_CACHE_MAX_ROWS", 1000)),
+    )
+
+
+def _cacheable_request():
+    return (
+        current_app.config.get("PAGE_CACHE_ENABLED", True)
+        and request.method == "GET"
+        and not current_user.is_authenticated
+        and "_flashes" not in session
+    )
+
+
+def _cache_key(query_args):
+    """request.path plus only the allowed query args, so made-up parameters share one entry."""
+    params = sorted((name, value) for name in query_args for value in request.args.getlist(name))
+    return request.path + ("?" + urlencode(params) if params else "")
+
+
+def cached_page(view=None, *, query_args=()):
+    """
+    Serve the view's response from the page cache while the data version is unchanged.
+    Use as @cached_page, or @cached_page(query_args=("page",)) for views that read query args;
+    other query args are ignored by the view and left out of the key.
+    """
+    if view is None:
+        return lambda v: cached_page(v, query_args=query_args)
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not _cacheable_request():
+            return view(*args, **kwargs)
+        key = _cache_key(query_args)
+        version = get_version()
+        try:
+            hit = _get(key, version)
+        except sqlite3.Error as e:
+            current_app.logger.warning("Page cache read failed: %s", e)
+            return view(*args, **kwargs)
+        if hit is not None:
+            status, content_type, body = hit
+            response = current_app.response_class(body, status=status, content_type=content_type)
+            response.headers["X-Page-Cache"] = "HIT"
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not session.modified and "Set-Cookie" not in response.headers:
+            try:
+                _put(key, version, response)
+            except sqlite3.Error as e:
+                current_app.logger.warning("Page cache write failed: %s", e)
+        response.headers["X-Page-Cache"] = "MISS"
+        return response
+    return wrapped
@@ -0,0 +1,190 @@
+"""
+Per-request instrumentation: query count, SQL time, template render time and the slowest
+statements, from SQLAlchemy engine events and Flask request hooks. Results go out as a
+Server-Timing header and into a per-process ring of recent requests for /admin/perf.
+A statement repeated PERF_N_PLUS_ONE_THRESHOLD times in one request is logged as a likely N+1.
+"""
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import before_render_template, current_app, g, has_app_context, request, template_rendered
+from flask_login import current_user
+from sqlalchemy import event
+
+_history = deque(maxlen=500)
+_history_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _statement(sql):
+    return " ".join(sql.split())[:300]
+
+
+def _stats():
+    """The current request's counters, or None outside a request (e.g. export threads)."""
+    return g.get("_perf") if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("perf_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["perf_started"].pop()
+    stats = _stats()
+    if stats is None:
+        return
+    ms = (time.perf_counter() - started) * 1000
+    stats["queries"] += 1
+    stats["sql_ms"] += ms
+    stats["statements"][statement] += 1
+    stats["slowest"].append((ms, statement))
+    if len(stats["slowest"]) > 20:
+        stats["slowest"] = sorted(stats["slowest"], reverse=True)[:10]
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    started = exception_context.connection.info.get("perf_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def _before_render(sender, template, context, **extra):
+    stats = _stats()
+    if stats is not None:
+        stats["render_started"].append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    stats = _stats()
+    if stats is not None and stats["render_started"]:
+        stats["render_ms"] += (time.perf_counter() - stats["render_started"].pop()) * 1000
+
+
+def _start_request():
+    g._perf = {
+        "started": time.perf_counter(),
+        "queries": 0,
+        "sql_ms": 0.0,
+        "render_ms": 0.0,
+        "render_started": [],
+        "statements": Counter(),
+        "slowest": [],
+    }
+
+
+def _show_server_timing():
+    mode = current_app.config.get("SERVER_TIMING", "staff")
+    if mode == "all":
+        return True
+    return mode == "staff" and current_user.is_authenticated
+
+
+def _finish_request(response):
+    stats = g.pop("_perf", None)
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - stats["started"]) * 1000
+    threshold = current_app.config.get("PERF_N_PLUS_ONE_THRESHOLD", 5)
+    repeated = [(n, s) for s, n in stats["statements"].most_common(3) if n >= threshold]
+    for n, sql in repeated:
+        current_app.logger.warning("Possible N+1 on %s: %d x %s", request.endpoint, n, _statement(sql))
+
+    slow_count = current_app.config.get("PERF_SLOW_STATEMENTS", 3)
+    record = {
+        "at": datetime.now(),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint or "-",
+        "status": response.status_code,
+        "total_ms": total_ms,
+        "queries": stats["queries"],
+        "sql_ms": stats["sql_ms"],
+        "render_ms": stats["render_ms"],
+        "slowest": [(ms, _statement(sql)) for ms, sql in sorted(stats["slowest"], reverse=True)[:slow_count]],
+        "repeated": [(n, _statement(sql)) for n, sql in repeated],
+    }
+    with _history_lock:
+        _history.append(record)
+
+    if _show_server_timing():
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats["sql_ms"]:.1f};desc="{stats["queries"]} queries", '
+            f'render;dur={stats["render_ms"]:.1f}, total;dur={total_ms:.1f}',
+        )
+    return response
+
+
+def init_app(app, engine):
+    """Instrument engine and app unless PERF_INSTRUMENTATION is off."""
+    if not app.config.get("PERF_INSTRUMENTATION", True):
+        return
+    global _history
+    _history = deque(maxlen=app.config.get("PERF_HISTORY", 500))
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def recent_requests():
+    with _history_lock:
+        return list(_history)
+
+
+def route_summary(records=None):
+    """Per (method, endpoint): request count, p50/p95/max ms, mean and max queries, N+1 hits; slowest p95 first."""
+    groups = {}
+    for r in recent_requests() if records is None else records:
+        groups.setdefault((r["method"], r["endpoint"]), []).append(r)
+    summary = []
+    for (method, endpoint), rows in groups.items():
+        times = sorted(r["total_ms"] for r in rows)
+        summary.append({
+            "method": method,
+            "endpoint": endpoint,
+            "count": len(rows),
+            "p50_ms": statistics.median(times),
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max_ms": times[-1],
+            "avg_queries": sum(r["queries"] for r in rows) / len(rows),
+            "max_queries": max(r["queries"] for r in rows),
+            "n_plus_one": sum(1 for r in rows if r["repeated"]),
+        })
+    summary.sort(key=lambda s: s["p95_ms"], reverse=True)
+    return summary
+
+
+@contextmanager
+def query_budget(engine, max_queries):
+    """
+    Fail with QueryBudgetExceeded when the block runs more than max_queries statements on engine:
+        with query_budget(db.engine, 5):
+            client.get("/events")
+    """
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    if len(statements) > max_queries:
+        repeated = Counter(_statement(s) for s in statements).most_common(3)
+        detail = "\n".join(f"  {n} x {sql}" for n, sql in repeated)
+        raise QueryBudgetExceeded(f"{len(statements)} queries, budget {max_queries}. Most repeated:\n{detail}")
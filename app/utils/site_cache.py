@@ -0,0 +1,37 @@
+"""In-process read-through cache for near-static rows (active year, About, sponsors).
+
+Entries expire after SITE_CACHE_TTL seconds or as soon as the "site" data-version stamp
+changes, which the year/about/sponsor write services bump after committing.
+Rows are loaded in a short-lived session and handed to each request as a copy merged
+into db.session without a query, so templates can still follow relationships.
+"""
+import time
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
+from app.models import db
+from app.utils.data_version import get_version
+
+_entries = {}
+
+
+def get_cached(key, statement, many=False):
+    """Rows for a select() statement (first row, or all when many=True), cached per key."""
+    version = get_version("site")
+    now = time.monotonic()
+    entry = _entries.get(key)
+    if entry is not None and entry[0] == version and entry[1] > now:
+        value = entry[2]
+    else:
+        with Session(db.engine) as session:
+            result = session.scalars(statement)
+            value = result.all() if many else result.first()
+        _entries[key] = (version, now + current_app.config.get("SITE_CACHE_TTL", 300), value)
+    if many:
+        return [db.session.merge(row, load=False) for row in value]
+    return db.session.merge(value, load=False) if value is not None else None
+
+
+def clear():
+    _entries.clear()
@@ -0,0 +1,50 @@
+"""SQLite engine profile: per-connection pragmas and pool settings for multi-worker deployments."""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def is_memory(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def is_sqlite_file(uri):
+    return make_url(uri).get_backend_name() == "sqlite" and not is_memory(uri)
+
+
+def engine_options(config):
+    """
+    Engine options for a file SQLite database. No pre-ping (a local file cannot drop the
+    connection); a small pool per worker, since writes serialize on the database lock anyway.
+    """
+    return {
+        "pool_size": config["SQLITE_POOL_SIZE"],
+        "max_overflow": config["SQLITE_MAX_OVERFLOW"],
+        "pool_timeout": config["SQLITE_POOL_TIMEOUT"],
+        "connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000},
+    }
+
+
+def pragmas(config):
+    return [
+        # First, so the journal_mode switch below also waits instead of failing on a busy file
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA journal_mode = {config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}",
+        # Negative cache_size is KiB rather than pages
+        f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+def install(engine, config):
+    """Run the profile's pragmas on every new DBAPI connection of engine."""
+    statements = pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
@@ -0,0 +1,52 @@
+"""Serving user uploads: long-lived caching, conditional/Range requests and optional nginx offload."""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from flask import abort, current_app, send_from_directory
+from werkzeug.security import safe_join
+
+# uuid4().hex names (optionally with a derivative suffix) never change content
+_CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{32}(_[a-z]+)?\.[A-Za-z0-9]+$")
+
+ONE_YEAR = 365 * 24 * 3600
+
+
+def send_upload(kind, folder, filename, immutable=None, as_attachment=False, download_name=None):
+    """
+    Serve filename from an upload folder.
+    kind names the upload type (gallery, sponsor, guidelines) and is used as the path segment
+    under UPLOAD_ACCEL_REDIRECT_PREFIX when nginx serves the bytes via X-Accel-Redirect.
+    immutable defaults to True for content-addressed names; pass False when the URL can
+    point at different files over time.
+    """
+    if immutable is None:
+        immutable = bool(_CONTENT_ADDRESSED.match(os.path.basename(filename)))
+    max_age = ONE_YEAR if immutable else current_app.config.get("UPLOAD_MAX_AGE", 3600)
+
+    prefix = current_app.config.get("UPLOAD_ACCEL_REDIRECT_PREFIX")
+    if prefix:
+        path = safe_join(str(folder), filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = current_app.response_class()
+        # Percent-encoded: headers must be latin-1, and nginx would cut the path at "?" or "#"
+        response.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{kind}/{quote(filename)}"
+        response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        if as_attachment:
+            response.headers.set("Content-Disposition", "attachment", filename=download_name or os.path.basename(filename))
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        # conditional=True (the default) gives ETag/Last-Modified, 304s and Range support
+        response = send_from_directory(
+            str(folder),
+            filename,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            max_age=max_age,
+        )
+    if immutable:
+        response.cache_control.immutable = True
+    return response
@@ -31,9 +31,18 @@ CREATE TABLE IF NOT EXISTS activities (
     status VARCHAR(32) NOT NULL DEFAULT 'upcoming',
     quota INTEGER,
     guideline_file VARCHAR(255),
+    registered_count INTEGER NOT NULL DEFAULT 0,
+    verified_count INTEGER NOT NULL DEFAULT 0,
+    attended_count INTEGER NOT NULL DEFAULT 0,
+    data_version INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (year_id) REFERENCES years(id) ON DELETE CASCADE
 );
+-- Existing databases: add the counter columns, then run `flask --app run goslides reconcile-counters`
+-- ALTER TABLE activities ADD COLUMN registered_count INTEGER NOT NULL DEFAULT 0;
+-- ALTER TABLE activities ADD COLUMN verified_count INTEGER NOT NULL DEFAULT 0;
+-- ALTER TABLE activities ADD COLUMN attended_count INTEGER NOT NULL DEFAULT 0;
+-- ALTER TABLE activities ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0;
 
 CREATE INDEX IF NOT EXISTS idx_activities_year ON activities(year_id);
 CREATE INDEX IF NOT EXISTS idx_activities_status ON activities(status);
@@ -54,9 +63,21 @@ CREATE TABLE IF NOT EXISTS registrants (
 );
 
 CREATE INDEX IF NOT EXISTS idx_registrants_activity ON registrants(activity_id);
+CREATE INDEX IF NOT EXISTS idx_registrants_activity_created ON registrants(activity_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_registrants_status ON registrants(status);
 CREATE INDEX IF NOT EXISTS idx_registrants_check_in_code ON registrants(check_in_code);
 
+-- Daily registration/check-in rollup per activity (dashboard charts)
+CREATE TABLE IF NOT EXISTS registration_daily_stats (
+    activity_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    registrations INTEGER NOT NULL DEFAULT 0,
+    attendances INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (activity_id, day),
+    FOREIGN KEY (activity_id) REFERENCES activities(id) ON DELETE CASCADE
+);
+-- Existing databases: run `flask --app run goslides rebuild-daily-stats` once after creating it
+
 -- Gallery (per year/activity, optional featured)
 CREATE TABLE IF NOT EXISTS gallery (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -65,10 +86,15 @@ CREATE TABLE IF NOT EXISTS gallery (
     file VARCHAR(255) NOT NULL,
     caption VARCHAR(512),
     is_featured BOOLEAN NOT NULL DEFAULT 0,
+    width INTEGER,
+    height INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (year_id) REFERENCES years(id) ON DELETE CASCADE,
     FOREIGN KEY (activity_id) REFERENCES activities(id) ON DELETE CASCADE
 );
+-- Existing databases (older rows keep serving the original file):
+-- ALTER TABLE gallery ADD COLUMN width INTEGER;
+-- ALTER TABLE gallery ADD COLUMN height INTEGER;
 CREATE INDEX IF NOT EXISTS idx_gallery_activity ON gallery(activity_id);
 CREATE INDEX IF NOT EXISTS idx_gallery_featured ON gallery(is_featured);
 
@@ -90,6 +116,80 @@ CREATE TABLE IF NOT EXISTS contact_messages (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Full-text search (app/services/search_service.py, created at startup or by `flask goslides search-index`):
+--   SQLite:   registrants_fts, activities_fts, contact_messages_fts are FTS5 external-content
+--             tables kept in sync by AFTER INSERT/DELETE/UPDATE OF triggers on their tables.
+--   Postgres: each table gets a generated search_vector tsvector column with a GIN index, e.g.
+--   ALTER TABLE registrants ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+--       setweight(to_tsvector('simple', coalesce(name, '')), 'A') || ...) STORED;
+--   CREATE INDEX idx_registrants_search ON registrants USING GIN (search_vector);
+
+-- Outgoing notifications (written with the registrant, delivered by `flask goslides send-notifications`)
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel VARCHAR(32) NOT NULL DEFAULT 'whatsapp',
+    recipient VARCHAR(64) NOT NULL,
+    message TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox(status, next_attempt_at);
+
+-- Token bucket per WhatsApp provider account, shared by every sending process
+CREATE TABLE IF NOT EXISTS send_rate_limits (
+    name VARCHAR(32) PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+-- WhatsApp broadcasts to an activity's verified registrants, with per-recipient delivery status
+CREATE TABLE IF NOT EXISTS broadcasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    activity_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued',
+    total INTEGER NOT NULL DEFAULT 0,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_by INTEGER,
+    heartbeat_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    FOREIGN KEY (activity_id) REFERENCES activities(id) ON DELETE CASCADE,
+    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS broadcast_recipients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    broadcast_id INTEGER NOT NULL,
+    registrant_id INTEGER,
+    phone VARCHAR(64) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    sent_at TIMESTAMP,
+    FOREIGN KEY (broadcast_id) REFERENCES broadcasts(id) ON DELETE CASCADE,
+    FOREIGN KEY (registrant_id) REFERENCES registrants(id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS idx_broadcast_recipients_status ON broadcast_recipients(broadcast_id, status);
+
+-- Participant exports rendered in the background; files live in EXPORT_FOLDER as <activity_id>-<data_version>.<format>
+CREATE TABLE IF NOT EXISTS export_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    activity_id INTEGER NOT NULL,
+    format VARCHAR(16) NOT NULL DEFAULT 'pdf',
+    data_version INTEGER NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued',
+    error TEXT,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    FOREIGN KEY (activity_id) REFERENCES activities(id) ON DELETE CASCADE,
+    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+);
+
 -- Activity log (Phase 3: admin action audit)
 CREATE TABLE IF NOT EXISTS activity_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -102,6 +202,8 @@ CREATE TABLE IF NOT EXISTS activity_log (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
 );
 CREATE INDEX IF NOT EXISTS idx_activity_log_created_at ON activity_log(created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_log_user ON activity_log(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_log_action ON activity_log(action, created_at);
 
 -- Sponsors table
 CREATE TABLE IF NOT EXISTS sponsors (
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark ekspor PDF peserta: waktu dan puncak memori untuk beberapa ukuran daftar.
+Jalankan dari folder proyek: python scripts/bench_pdf_export.py
+Atau dengan ukuran sendiri:   python scripts/bench_pdf_export.py 100 5000 50000
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from types import SimpleNamespace
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_export_service import export_registrants_pdf
+
+
+def fake_registrants(n):
+    """Registrant-like rows generated lazily, the way a streaming query would yield them."""
+    for i in range(n):
+        yield SimpleNamespace(
+            name=f"Peserta Nomor {i}",
+            school=f"SMA Negeri {i % 97 + 1}",
+            email=f"peserta{i}@sekolah.id",
+            phone=f"0812{i:08d}",
+            status="verified" if i % 3 else "pending",
+            attended_at=datetime(2026, 1, 1) if i % 2 else None,
+        )
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 5000, 50000]
+    activity = SimpleNamespace(title="Lomba Benchmark", date=date(2026, 1, 1))
+    export_registrants_pdf(activity, fake_registrants(10)).close()  # warm up fonts and styles
+
+    print(f"{'rows':>8} {'seconds':>9} {'peak MiB':>9} {'PDF KiB':>9}")
+    for n in sizes:
+        tracemalloc.start()
+        started = time.perf_counter()
+        out = export_registrants_pdf(activity, fake_registrants(n))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        out.seek(0, os.SEEK_END)
+        size = out.tell()
+        out.close()
+        print(f"{n:>8} {elapsed:>9.2f} {peak / 2**20:>9.1f} {size / 1024:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
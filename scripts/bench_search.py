@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark pencarian peserta: indeks full-text (FTS5 / tsvector) dibanding ILIKE biasa.
+Secara bawaan memakai database SQLite sementara yang diisi 1.000.000 peserta palsu.
+Jalankan dari folder proyek: python scripts/bench_search.py
+Jumlah baris sendiri:        python scripts/bench_search.py --rows 100000
+Postgres (database kosong khusus benchmark!):
+                             python scripts/bench_search.py --database-url postgresql://...
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ["Budi", "Siti", "Agus", "Dewi", "Rizky", "Putri", "Andi", "Nur", "Fajar", "Ayu", "Bayu", "Indah"]
+LAST_NAMES = ["Santoso", "Wijaya", "Pratama", "Lestari", "Saputra", "Hidayat", "Kurniawan", "Rahmawati"]
+CITIES = ["Bandung", "Jakarta", "Surabaya", "Medan", "Makassar", "Semarang", "Malang", "Padang"]
+QUERIES = ["budi santoso", "sma negeri 7", "rahmawati", "peserta123456", "bay pra", "zzzz"]
+
+
+def fake_rows(activity_id, start, count):
+    for i in range(start, start + count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        yield {
+            "activity_id": activity_id,
+            "name": f"{first} {last}",
+            "school": f"SMA Negeri {i % 53 + 1} {CITIES[i % len(CITIES)]}",
+            "email": f"peserta{i}@sekolah.id",
+            "phone": f"0812{i:08d}",
+            "status": "pending",
+        }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="goslides-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmpdir}/bench.db"
+
+    from sqlalchemy import insert
+    from app import create_app
+    from app.models import db, Registrant
+    from app.services.activity_service import create_activity
+    from app.services.registrant_service import filter_registrants
+    from app.services.search_service import ensure_search_index, search
+    from app.services.year_service import create_year
+
+    app = create_app()
+    with app.app_context():
+        ensure_search_index()
+        year = create_year("Benchmark", "bench")
+        activity = create_activity(year.id, "Lomba Benchmark", "", None, "competition", "open", None)
+
+        # Rows go in with the sync triggers / generated column active, as in production
+        started = time.perf_counter()
+        for start in range(0, args.rows, args.batch):
+            db.session.execute(insert(Registrant), list(fake_rows(activity.id, start, min(args.batch, args.rows - start))))
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+        print(f"inserted {args.rows} rows in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s, index kept in sync)")
+        print(f"database: {db.engine.url.render_as_string(hide_password=True)}\n")
+
+        print(f"{'query':<16} {'ranked ms':>10} {'ILIKE ms':>10} {'hits':>5}")
+        for q in QUERIES:
+            ranked_ms, (hits, _) = timed(lambda: search("registrants", q), args.repeat)
+            like_ms, _ = timed(
+                lambda: filter_registrants(Registrant.query, search=q).order_by(Registrant.id.desc()).limit(20).all(),
+                args.repeat,
+            )
+            print(f"{q:<16} {ranked_ms:>10.1f} {like_ms:>10.1f} {len(hits):>5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
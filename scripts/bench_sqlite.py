@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark profil SQLite: beberapa proses (seperti worker gunicorn) mendaftar dan membaca
+bersamaan, sekali dengan pengaturan bawaan SQLite (SQLITE_TUNING=0) dan sekali dengan profil
+WAL/busy_timeout/synchronous=NORMAL. Setiap mode memakai file basis data sementara yang baru.
+
+Jalankan dari folder proyek: python scripts/bench_sqlite.py
+Opsi: --workers 8 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def worker(worker_id, activity_id, start_at, seconds, write_ratio, results):
+    from app import create_app
+    from app.models import db
+    from app.services.activity_service import get_activities_for_year
+    from app.services.registrant_service import create_registrant, get_registrants_page
+
+    app = create_app()
+    counts = Counter()
+    rng = random.Random(worker_id)
+    time.sleep(max(start_at - time.time(), 0))
+    deadline = start_at + seconds
+    with app.app_context():
+        i = 0
+        while time.time() < deadline:
+            i += 1
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    create_registrant(activity_id, f"Peserta {worker_id}-{i}", "Sekolah", "", f"w{worker_id}-{i}@bench.local")
+                    kind = "writes"
+                else:
+                    get_activities_for_year()
+                    get_registrants_page(activity_id, per_page=50)
+                    kind = "reads"
+                counts[kind] += 1
+                counts[f"{kind}_ms"] += (time.perf_counter() - started) * 1000
+            except Exception as e:  # count and keep going, like a worker answering a 500
+                db.session.rollback()
+                counts["locked" if "locked" in str(e) else "errors"] += 1
+            finally:
+                db.session.remove()
+    results.put(dict(counts))
+
+
+def run(mode, args):
+    tmp = tempfile.mkdtemp(prefix=f"goslides-sqlite-{mode}-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["SQLITE_TUNING"] = "1" if mode == "tuned" else "0"
+
+    from app import create_app
+    from app.services.activity_service import create_activity
+    from app.services.year_service import create_year
+
+    app = create_app()
+    with app.app_context():
+        year = create_year("Benchmark", "bench")
+        activity_id = create_activity(year.id, "Lomba Benchmark", "", None, "competition", "open", None).id
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    start_at = time.time() + 5  # every worker has imported the app and starts together
+    procs = [
+        ctx.Process(target=worker, args=(n, activity_id, start_at, args.seconds, args.write_ratio, results))
+        for n in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    total = Counter()
+    for _ in procs:
+        total.update(results.get())
+    for p in procs:
+        p.join()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="processes")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of operations that register")
+    args = parser.parse_args()
+
+    print(f"{'mode':<9} {'writes/s':>9} {'reads/s':>9} {'write ms':>9} {'read ms':>9} {'locked':>7} {'errors':>7}")
+    for mode in ("default", "tuned"):
+        t = run(mode, args)
+        print(
+            f"{mode:<9} {t['writes'] / args.seconds:>9.1f} {t['reads'] / args.seconds:>9.1f} "
+            f"{t['writes_ms'] / max(t['writes'], 1):>9.1f} {t['reads_ms'] / max(t['reads'], 1):>9.1f} "
+            f"{t['locked']:>7} {t['errors']:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark fungsi-fungsi service yang paling sering dipanggil, di atas data sintetis
+(scripts/seed_data.py), dengan hasil JSON yang bisa dibandingkan antar-commit.
+
+Jalankan dari folder proyek:
+  python scripts/benchmark.py --scale 100k --output bench-main.json
+  python scripts/benchmark.py --scale 100k --output bench-fitur.json --baseline bench-main.json
+Bandingkan dua hasil yang sudah ada:
+  python scripts/benchmark.py --compare bench-main.json bench-fitur.json
+--baseline/--compare keluar dengan kode 1 bila ada fungsi yang melambat lebih dari --threshold.
+Tanpa --database-url dipakai file SQLite sementara yang baru diisi. Dengan --database-url hanya
+fungsi baca yang diukur (create_registrant dilewati) agar basis data itu tidak berubah.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "min_ms": round(times[0], 3),
+        "runs": repeat,
+    }
+
+
+def cases(repeat, writes=True):
+    """(name, function, repeats) for each benchmarked call; needs an app context.
+
+    writes=False leaves out the calls that commit rows (create_registrant).
+    """
+    from sqlalchemy import func
+    from app.models import db, Activity, Registrant, Year
+    from app.services.activity_service import get_activities_for_year
+    from app.services.activity_log_service import get_recent_logs
+    from app.services.dashboard_service import get_dashboard_stats
+    from app.services.pdf_export_service import export_registrants_pdf
+    from app.services.registrant_service import (
+        create_registrant,
+        get_registrants_for_activity,
+        get_registrants_page,
+        stream_registrants_for_activity,
+    )
+    from app.services.search_service import search
+
+    active_year = Year.query.filter_by(active=True).first()
+    # The activity with the most registrants is the worst case for the list views
+    biggest_id = (
+        db.session.query(Registrant.activity_id)
+        .group_by(Registrant.activity_id)
+        .order_by(func.count(Registrant.id).desc())
+        .limit(1)
+        .scalar()
+    )
+    biggest = db.session.get(Activity, biggest_id)
+    open_activity = Activity.query.filter_by(status="open", quota=None).first()
+    counter = iter(range(10**9))
+
+    def export_pdf():
+        export_registrants_pdf(biggest, stream_registrants_for_activity(biggest.id)).close()
+
+    def register():
+        i = next(counter)
+        create_registrant(open_activity.id, f"Benchmark {i}", "SMA Benchmark", "0812", f"bench{i}@benchmark.local")
+
+    benchmarks = [
+        ("get_activities_for_year", lambda: get_activities_for_year(year_active=True), repeat),
+        ("get_activities_for_year(with_covers)", lambda: get_activities_for_year(year_active=True, with_covers=True), repeat),
+        ("get_registrants_for_activity", lambda: get_registrants_for_activity(biggest.id), repeat),
+        ("get_registrants_page", lambda: get_registrants_page(biggest.id, per_page=50), repeat),
+        ("get_dashboard_stats", lambda: get_dashboard_stats(active_year), repeat),
+        ("create_registrant", register, repeat * 5),
+        ("export_registrants_pdf", export_pdf, max(repeat // 5, 3)),
+        ("get_recent_logs", lambda: get_recent_logs(), repeat),
+        ("search(registrants)", lambda: search("registrants", "budi santoso"), repeat),
+    ]
+    if not writes:
+        benchmarks = [b for b in benchmarks if b[0] != "create_registrant"]
+    return benchmarks, {"biggest_activity_registrants": biggest.registered_count}
+
+
+def run(args):
+    tmp = tempfile.mkdtemp(prefix="goslides-bench-")
+    fresh = not args.database_url
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+    from app import create_app
+    from app.models import db, Registrant
+    from seed_data import seed
+
+    app = create_app()
+    # Keep side effects (data-version stamps, QR cache, exports) out of the project folder
+    app.config.update(
+        DATA_VERSION_FOLDER=os.path.join(tmp, "versions"),
+        QR_CACHE_FOLDER=os.path.join(tmp, "qr"),
+        EXPORT_FOLDER=os.path.join(tmp, "exports"),
+    )
+    with app.app_context():
+        if fresh or Registrant.query.first() is None:
+            print(f"Seeding scale {args.scale}…")
+            seed(args.scale, seed=args.seed)
+        registrants = db.session.query(Registrant.id).count()
+        # create_registrant commits its rows, so it only runs against the temporary database
+        benchmarks, extra = cases(args.repeat, writes=fresh)
+        if not fresh:
+            print("  create_registrant skipped: it would add rows to --database-url")
+        results = {}
+        for name, fn, repeat in benchmarks:
+            fn()  # warm up caches and connections
+            results[name] = _measure(fn, repeat)
+            db.session.remove()
+            r = results[name]
+            print(f"  {name:<38} median {r['median_ms']:>9.2f} ms   p95 {r['p95_ms']:>9.2f} ms   ({repeat} runs)")
+        meta = {
+            "commit": _git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "dialect": db.engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "registrants": registrants,
+            **extra,
+        }
+    return {"meta": meta, "results": results}
+
+
+def compare(old, new, threshold, min_delta_ms):
+    """
+    Print old vs new medians; return the names that got slower by more than threshold and by at
+    least min_delta_ms (sub-millisecond timings jitter by tens of percent).
+    """
+    print(f"{'benchmark':<38} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    regressions = []
+    for name, new_result in new["results"].items():
+        old_result = old["results"].get(name)
+        if old_result is None:
+            print(f"{name:<38} {'-':>10} {new_result['median_ms']:>10.2f}      new")
+            continue
+        before, after = old_result["median_ms"], new_result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold and after - before >= min_delta_ms:
+            regressions.append(name)
+            flag = "  SLOWER"
+        print(f"{name:<38} {before:>10.2f} {after:>10.2f} {change:>+7.0%}{flag}")
+    if old["meta"].get("scale") != new["meta"].get("scale"):
+        print(f"Note: scales differ ({old['meta'].get('scale')} vs {new['meta'].get('scale')})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="1k", type=str.lower, choices=["1k", "100k", "1m"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", help="an already seeded database (seeded first if it has no registrants)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare this run against")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="only compare two results files")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown of a median (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            regressions = compare(json.load(f_old), json.load(f_new), args.threshold, args.min_delta_ms)
+    else:
+        result = run(args)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"Wrote {args.output}")
+        regressions = []
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(json.load(f), result, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"FAIL: {len(regressions)} benchmark(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Cek anggaran kueri: mengisi basis data SQLite sementara dengan banyak acara, foto dan peserta,
+lalu memanggil halaman-halaman utama dan gagal (exit 1) bila ada halaman yang menjalankan
+lebih banyak kueri dari anggarannya. Anggaran tidak bergantung pada jumlah data, jadi N+1
+baru langsung ketahuan.
+
+Jalankan dari folder proyek: python scripts/check_query_budgets.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ACTIVITIES = 12
+PHOTOS_PER_ACTIVITY = 3
+REGISTRANTS_PER_ACTIVITY = 60
+
+# (path, max queries); {aid} is an activity with registrants and photos
+PUBLIC_BUDGETS = [
+    ("/", 4),
+    ("/events", 3),
+    ("/competition/{aid}", 3),
+    ("/competition/{aid}/gallery", 3),
+    ("/about", 2),
+]
+ADMIN_BUDGETS = [
+    ("/admin/", 6),
+    ("/admin/years/{year_id}/activities", 4),
+    ("/admin/activities/{aid}/registrants", 5),
+    ("/admin/activities/{aid}/registrants?q=peserta", 5),
+    ("/admin/search?q=peserta", 4),
+    ("/admin/search?q=lomba&kind=activities", 4),
+    ("/admin/contact-messages", 3),
+    ("/admin/activity-log", 4),
+]
+
+
+def seed():
+    from app.models import db, Gallery
+    from app.services.year_service import create_year, set_active_year
+    from app.services.activity_service import create_activity
+    from app.services.registrant_service import create_registrant
+    from app.services.search_service import ensure_search_index
+
+    ensure_search_index()
+    year = create_year("2026", "Anggaran kueri")
+    set_active_year(year.id)
+    activity_ids = []
+    for i in range(ACTIVITIES):
+        activity = create_activity(year.id, f"Lomba {i}", "Deskripsi lomba", None, "competition", "open", None)
+        activity_ids.append(activity.id)
+        for k in range(PHOTOS_PER_ACTIVITY):
+            db.session.add(Gallery(year_id=year.id, activity_id=activity.id, file=f"{i:02d}{k:02d}.jpg", is_featured=k == 0))
+        db.session.commit()
+        for n in range(REGISTRANTS_PER_ACTIVITY):
+            create_registrant(activity.id, f"Peserta {i}-{n}", "SMA Negeri 1", "0812", f"p{i}-{n}@sekolah.id")
+    return year.id, activity_ids[0]
+
+
+def check(client, engine, budgets, values):
+    from app.utils.perf import QueryBudgetExceeded, query_budget
+
+    failures = 0
+    for path, budget in budgets:
+        url = path.format(**values)
+        client.get(url)  # warm up: first visits create defaults (About page) and fill per-worker caches
+        try:
+            with query_budget(engine, budget) as statements:
+                status = client.get(url).status_code
+            verdict = "ok" if status == 200 else "UNEXPECTED STATUS"
+            failures += status != 200
+        except QueryBudgetExceeded as e:
+            status, verdict = "-", f"OVER BUDGET\n{e}"
+            failures += 1
+        print(f"{url:<48} {len(statements):>3} / {budget:<3} {status}  {verdict}")
+    return failures
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="goslides-budget-")
+    try:
+        return run(tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(tmp):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'budget.db')}"
+
+    from app import create_app
+    from app.config import Config
+    from app.models import db
+
+    app = create_app()
+    # Every file the app writes (caches, version stamps, exports, backups, uploads) goes to tmp
+    app.config.update({
+        key: os.path.join(tmp, key.lower()) for key in dir(Config) if key.endswith(("_FOLDER", "_PATH"))
+    })
+    app.config.update(
+        PAGE_CACHE_ENABLED=False,
+        AUDIT_LOG_BATCH=1,
+        WTF_CSRF_ENABLED=False,
+    )
+    with app.app_context():
+        year_id, aid = seed()
+        engine = db.engine
+    values = {"year_id": year_id, "aid": aid}
+
+    client = app.test_client()
+    failures = check(client, engine, PUBLIC_BUDGETS, values)
+    client.post("/admin/login", data={"email": "admin@goslides.com", "password": "admin123"})
+    failures += check(client, engine, ADMIN_BUDGETS, values)
+    if failures:
+        print(f"FAIL: {failures} page(s) over budget or not answering 200")
+        return 1
+    print("OK: every page within its query budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
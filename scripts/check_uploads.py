@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Cek penyajian upload: nama file dengan karakter non-ASCII atau tanda "?" (misalnya logo sponsor
+yang menyimpan nama asli dari pengunggah) harus tetap tersaji, baik langsung oleh Flask maupun
+lewat X-Accel-Redirect ke nginx. Keluar dengan kode 1 bila ada yang gagal.
+
+Jalankan dari folder proyek: python scripts/check_uploads.py
+"""
+import os
+import sys
+import tempfile
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (file name on disk, expected X-Accel-Redirect with prefix /_uploads)
+CASES = [
+    ("sponsor_1700000000_logo.png", "/_uploads/sponsor/sponsor_1700000000_logo.png"),
+    ("sponsor_1700000000_logo–sekolah.png", "/_uploads/sponsor/sponsor_1700000000_logo%E2%80%93sekolah.png"),
+    ("sponsor_1700000000_a?b.png", "/_uploads/sponsor/sponsor_1700000000_a%3Fb.png"),
+    ("sponsor_1700000000_logo #1.png", "/_uploads/sponsor/sponsor_1700000000_logo%20%231.png"),
+]
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="goslides-uploads-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'uploads.db')}")
+
+    from app import create_app
+    from app.utils.uploads import send_upload
+
+    app = create_app()
+    for name, _ in CASES:
+        with open(os.path.join(tmp, name), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+
+    failures = 0
+    for name, expected in CASES:
+        with app.test_request_context():
+            app.config["UPLOAD_ACCEL_REDIRECT_PREFIX"] = "/_uploads"
+            response = send_upload("sponsor", tmp, name, immutable=True)
+            header = response.headers.get("X-Accel-Redirect")
+            try:
+                # What the WSGI server does when it writes the headers
+                for key, value in response.headers.to_wsgi_list():
+                    value.encode("latin-1")
+                offload = "ok" if header == expected else f"got {header!r}, expected {expected!r}"
+            except UnicodeEncodeError as e:
+                offload = f"header not latin-1: {e}"
+
+            app.config["UPLOAD_ACCEL_REDIRECT_PREFIX"] = ""
+            response = send_upload("sponsor", tmp, name, immutable=True)
+            response.direct_passthrough = False
+            direct = "ok" if response.status_code == 200 and response.get_data().startswith(b"\x89PNG") else f"status {response.status_code}"
+            response.close()
+
+        failed = offload != "ok" or direct != "ok"
+        failures += failed
+        print(f"{name:<40} X-Accel-Redirect: {offload:<8} direct: {direct}")
+    if failures:
+        print(f"FAIL: {failures} file name(s) not served correctly")
+        return 1
+    print("OK: every file name served correctly")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Uji beban ujung-ke-ujung: menjalankan app di bawah gunicorn (atau server Flask berulir bila
+gunicorn tidak terpasang) di atas basis data yang diisi scripts/seed_data.py, lalu banyak klien
+bersamaan memutar campuran lalu lintas: jelajah halaman publik, pendaftaran (dengan token CSRF),
+check-in QR dan daftar admin. Melaporkan throughput, latensi p50/p95/p99, error dan kuota yang
+terlampaui (oversold).
+
+Skenario bawaan:
+  opening    pendaftaran baru dibuka: jelajah 55, daftar 40, admin 5
+  event-day  hari acara: check-in 70, jelajah 15, admin 15
+Contoh (dari folder proyek):
+  python scripts/loadtest.py --scenario opening --clients 50 --duration 30 --quota 300
+  python scripts/loadtest.py --mix browse=40,register=40,checkin=10,admin=10 --workers 8
+Postgres: --database-url postgresql://... harus basis data KOSONG khusus uji beban: skrip mengisinya
+dengan data sintetis dan pendaftaran uji, lalu tidak menghapusnya. Basis data yang sudah berisi ditolak.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = {
+    "opening": {"browse": 55, "register": 40, "admin": 5},
+    "event-day": {"checkin": 70, "browse": 15, "admin": 15},
+}
+ADMIN_EMAIL = "admin@goslides.com"
+ADMIN_PASSWORD = "admin123"
+
+_CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in ("browse", "register", "checkin", "admin"):
+            raise argparse.ArgumentTypeError(f"unknown traffic kind {kind!r}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_database(args):
+    """Seed the (empty) database and add the activity whose registration opens; returns ids and codes for the clients."""
+    from app import create_app
+    from app.models import Registrant, Year
+    from app.services.activity_service import create_activity, get_activities_for_year
+    from seed_data import seed
+
+    app = create_app()
+    with app.app_context():
+        if Year.query.first() is not None:
+            raise SystemExit("The database already has data; use an empty, throwaway database for load tests")
+        seed(args.scale, echo=lambda msg: None)
+        year = Year.query.filter_by(active=True).first()
+        rush = create_activity(year.id, "Lomba Uji Beban", "Pendaftaran dibuka serentak.", None, "competition", "open", args.quota)
+        activity_ids = [a.id for a in get_activities_for_year(year_active=True)]
+        codes = [
+            code for (code,) in Registrant.query.with_entities(Registrant.check_in_code)
+            .filter(Registrant.check_in_code.isnot(None), Registrant.activity_id.in_(activity_ids))
+            .limit(20000)
+        ]
+        return {"rush_id": rush.id, "activity_ids": activity_ids, "codes": codes}
+
+
+def start_server(args, env, log):
+    port = _free_port()
+    if importlib.util.find_spec("gunicorn") and not args.no_gunicorn:
+        kind = f"gunicorn ({args.workers} workers x {args.threads} threads)"
+        cmd = [
+            sys.executable, "-m", "gunicorn", "run:app",
+            "-b", f"127.0.0.1:{port}", "-w", str(args.workers), "-k", "gthread", "--threads", str(args.threads),
+        ]
+    else:
+        kind = "flask threaded server (gunicorn not installed)"
+        cmd = [sys.executable, "-m", "flask", "--app", "run", "run", "--port", str(port), "--with-threads", "--no-reload", "--no-debugger"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"Server exited with code {proc.returncode}; see {log.name}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return proc, base_url, kind
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"Server did not answer /health within 60s; see {log.name}")
+
+
+class Client:
+    """One simulated user with its own cookie jar."""
+
+    def __init__(self, base_url, data, client_id, timeout):
+        self.base_url = base_url
+        self.data = data
+        self.id = client_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.rng = random.Random(client_id)
+        self.logged_in = False
+        self.sequence = 0
+
+    def get(self, path, **kwargs):
+        return self.session.get(self.base_url + path, timeout=self.timeout, **kwargs)
+
+    def post(self, path, data, **kwargs):
+        return self.session.post(self.base_url + path, data=data, timeout=self.timeout, **kwargs)
+
+    def _csrf(self, response):
+        m = _CSRF_RE.search(response.text)
+        return m.group(1) if m else None
+
+    def browse(self, record):
+        activity_id = self.rng.choice(self.data["activity_ids"])
+        path = self.rng.choice(["/", "/events", f"/competition/{activity_id}", f"/competition/{activity_id}/gallery"])
+        record("browse", self.get, path)
+
+    def register(self, record):
+        rush_id = self.data["rush_id"]
+        form = record("register_form", self.get, f"/competition/{rush_id}/register", allow_redirects=False)
+        if form is None:
+            return
+        if form.status_code in (301, 302):
+            record.outcome("closed")
+            return
+        token = self._csrf(form)
+        self.sequence += 1
+        response = record("register_submit", self.post, f"/competition/{rush_id}/register", {
+            "csrf_token": token or "",
+            "name": f"Peserta Beban {self.id}-{self.sequence}",
+            "school": "SMA Negeri 1 Bandung",
+            "phone": "081234567890",
+            "email": f"beban{self.id}x{self.sequence}@peserta.id",
+        })
+        if response is None:
+            return
+        if "Pendaftaran berhasil" in response.text:
+            record.outcome("accepted")
+        elif "kuota sudah penuh" in response.text:
+            record.outcome("full")
+        else:
+            # Form shown again: CSRF or validation failure
+            record.outcome("rejected")
+
+    def checkin(self, record):
+        # A few unknown codes, like mistyped or foreign QR codes
+        code = self.rng.choice(self.data["codes"]) if self.rng.random() < 0.95 else f"unknown{self.rng.randint(0, 10**6)}"
+        record("checkin", self.get, f"/checkin/{code}")
+
+    def admin(self, record):
+        if not self.logged_in:
+            page = record("admin_login", self.get, "/admin/login")
+            if page is None:
+                return
+            response = record("admin_login", self.post, "/admin/login", {
+                "csrf_token": self._csrf(page) or "", "email": ADMIN_EMAIL, "password": ADMIN_PASSWORD,
+            })
+            self.logged_in = response is not None and "/admin/login" not in response.url
+            return
+        activity_id = self.rng.choice(self.data["activity_ids"])
+        path = self.rng.choice([
+            "/admin/",
+            f"/admin/activities/{activity_id}/registrants",
+            f"/admin/activities/{self.data['rush_id']}/registrants",
+            "/admin/search?q=budi",
+        ])
+        record("admin", self.get, path)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = defaultdict(Counter)
+        self.outcomes = Counter()
+
+    def __call__(self, kind, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = method(*args, **kwargs)
+        except requests.RequestException as e:
+            with self.lock:
+                self.errors[kind][type(e).__name__] += 1
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.latencies[kind].append(elapsed)
+            self.statuses[kind][response.status_code] += 1
+            if response.status_code >= 500:
+                self.errors[kind][f"HTTP {response.status_code}"] += 1
+        return response
+
+    def outcome(self, name):
+        with self.lock:
+            self.outcomes[name] += 1
+
+
+def _percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))] if sorted_values else 0.0
+
+
+def run_clients(base_url, data, mix, args):
+    recorder = Recorder()
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    stop_at = time.time() + args.duration
+
+    def loop(client_id):
+        client = Client(base_url, data, client_id, args.timeout)
+        while time.time() < stop_at:
+            kind = client.rng.choices(kinds, weights)[0]
+            getattr(client, kind)(recorder)
+            if args.think_ms:
+                time.sleep(client.rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    threads = [threading.Thread(target=loop, args=(n,), daemon=True) for n in range(args.clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - started
+
+
+def check_quota(rush_id):
+    from app import create_app
+    from app.models import db, Activity, Registrant
+
+    app = create_app()
+    with app.app_context():
+        activity = db.session.get(Activity, rush_id)
+        rows = Registrant.query.filter_by(activity_id=rush_id).count()
+        return {"quota": activity.quota, "rows": rows, "counter": activity.registered_count, "status": activity.status}
+
+
+def report(recorder, elapsed, quota, server_kind, args):
+    print(f"\nServer:   {server_kind}")
+    print(f"Clients:  {args.clients} for {elapsed:.1f}s")
+    print(f"\n{'kind':<16} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}  statuses")
+    total_requests = total_errors = 0
+    for kind in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = sorted(recorder.latencies[kind])
+        errors = sum(recorder.errors[kind].values())
+        count = len(values) + sum(c for name, c in recorder.errors[kind].items() if not name.startswith("HTTP"))
+        total_requests += count
+        total_errors += errors
+        statuses = " ".join(f"{code}:{n}" for code, n in sorted(recorder.statuses[kind].items()))
+        print(
+            f"{kind:<16} {count:>9} {count / elapsed:>8.1f} {_percentile(values, 0.50):>8.1f} "
+            f"{_percentile(values, 0.95):>8.1f} {_percentile(values, 0.99):>8.1f} {errors:>7}  {statuses}"
+        )
+    print(f"\nTotal:    {total_requests} requests, {total_requests / elapsed:.1f} req/s, "
+          f"{total_errors} errors ({total_errors / max(total_requests, 1):.2%})")
+    for kind, errors in recorder.errors.items():
+        for name, n in errors.items():
+            print(f"  {kind}: {n} x {name}")
+    if recorder.outcomes:
+        print("Registrations: " + ", ".join(f"{name} {n}" for name, n in sorted(recorder.outcomes.items())))
+
+    failed = False
+    if quota:
+        oversold = max(quota["rows"] - (quota["quota"] or quota["rows"]), 0)
+        print(f"Quota:    {quota['rows']} registrants for quota {quota['quota']}, counter {quota['counter']}, "
+              f"status {quota['status']}, oversold {oversold}")
+        if oversold or quota["rows"] != quota["counter"]:
+            print("FAIL: quota oversold or counter out of sync")
+            failed = True
+        if quota["rows"] != recorder.outcomes["accepted"]:
+            print(f"FAIL: {recorder.outcomes['accepted']} accepted responses but {quota['rows']} rows")
+            failed = True
+    if total_errors / max(total_requests, 1) > args.max_error_rate:
+        print(f"FAIL: error rate above {args.max_error_rate:.2%}")
+        failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="opening")
+    parser.add_argument("--mix", type=parse_mix, help="overrides --scenario, e.g. browse=50,register=30,checkin=10,admin=10")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a client's requests")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--quota", type=int, default=300, help="quota of the activity whose registration opens")
+    parser.add_argument("--scale", default="1k", type=str.lower, choices=["1k", "100k", "1m"], help="seed size")
+    parser.add_argument(
+        "--database-url",
+        help="default: a new temporary SQLite file. Must be an EMPTY database: it is seeded and written to, and left as is",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--no-gunicorn", action="store_true", help="use the Flask threaded server even if gunicorn is installed")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="exit 1 above this share of failed requests")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="goslides-load-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    # Keep the page cache, version stamps, QR cache, exports and backups out of the repo's instance/
+    for key in ("DATA_VERSION_FOLDER", "PAGE_CACHE_PATH", "QR_CACHE_FOLDER", "EXPORT_FOLDER", "BACKUP_FOLDER"):
+        os.environ[key] = os.path.join(tmp, key.lower())
+    mix = args.mix or SCENARIOS[args.scenario]
+
+    print(f"Preparing database ({database_url}, scale {args.scale})…")
+    data = prepare_database(args)
+    if not data["codes"] and mix.get("checkin"):
+        raise SystemExit("No check-in codes in the database")
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_DEBUG="0")
+    log_path = os.path.join(tmp, "server.log")
+    with open(log_path, "w") as log:
+        proc, base_url, server_kind = start_server(args, env, log)
+        try:
+            print(f"Running {mix} against {base_url}…")
+            recorder, elapsed = run_clients(base_url, data, mix, args)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    quota = check_quota(data["rush_id"]) if mix.get("register") else None
+    status = report(recorder, elapsed, quota, server_kind, args)
+    if status == 0:
+        shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        print(f"Server log: {log_path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
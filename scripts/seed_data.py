@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Isi basis data dengan data sintetis untuk benchmark dan uji beban: tahun, acara, peserta,
+foto galeri, log aktivitas dan pesan kontak. Hasilnya sama setiap kali untuk --seed yang sama.
+
+Skala: 1k, 100k atau 1m peserta.
+Jalankan dari folder proyek: python scripts/seed_data.py --scale 100k
+Basis data: --database-url (atau DATABASE_URL); tanpa keduanya dibuat file SQLite sementara.
+Menolak mengisi basis data yang sudah punya peserta kecuali dengan --append.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {
+    "1k": {"years": 2, "activities": 10, "registrants": 1_000, "gallery": 40, "logs": 2_000, "messages": 50},
+    "100k": {"years": 3, "activities": 60, "registrants": 100_000, "gallery": 600, "logs": 50_000, "messages": 2_000},
+    "1m": {"years": 5, "activities": 200, "registrants": 1_000_000, "gallery": 2_000, "logs": 300_000, "messages": 10_000},
+}
+BATCH = 10_000
+
+FIRST_NAMES = ["Budi", "Siti", "Agus", "Dewi", "Rizky", "Putri", "Andi", "Nur", "Fajar", "Ayu", "Bayu", "Indah", "Yoga", "Rina"]
+LAST_NAMES = ["Santoso", "Wijaya", "Pratama", "Lestari", "Saputra", "Hidayat", "Kurniawan", "Rahmawati", "Nugroho", "Sari"]
+CITIES = ["Bandung", "Jakarta", "Surabaya", "Medan", "Makassar", "Semarang", "Malang", "Padang", "Denpasar", "Pontianak"]
+TOPICS = ["Robotik", "Debat Bahasa Inggris", "Olimpiade Matematika", "Desain Poster", "Fotografi", "Coding", "Sains", "Pidato"]
+LOG_ACTIONS = [("update", "activity"), ("verify", "registrant"), ("mark_attended", "registrant"), ("create", "gallery"), ("login", "user")]
+
+
+def _insert(model, rows):
+    from sqlalchemy import insert
+    from app.models import db
+
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(insert(model), rows[start:start + BATCH])
+        db.session.commit()
+
+
+def seed(scale="1k", seed=42, echo=print):
+    """Fill the app's database (inside an app context) at the given scale; returns the row counts."""
+    from sqlalchemy import func
+    from app.models import db, Activity, ActivityLog, ContactMessage, Gallery, Registrant, User, Year
+    from app.services.activity_service import reconcile_activity_counters
+    from app.services.dashboard_service import rebuild_daily_stats
+    from app.services.search_service import ensure_search_index
+
+    sizes = SCALES[scale.lower()]
+    rng = random.Random(seed)
+    # Rows go in with the search index kept in sync, as after a deploy
+    ensure_search_index()
+    today = date.today()
+    started = time.perf_counter()
+
+    first_year = today.year - sizes["years"] + 1
+    _insert(Year, [
+        {"name": str(first_year + i), "theme": f"Tema {first_year + i}", "active": i == sizes["years"] - 1}
+        for i in range(sizes["years"])
+    ])
+    years = Year.query.order_by(Year.id).all()
+
+    activity_rows = []
+    for i in range(sizes["activities"]):
+        year = years[i * len(years) // sizes["activities"]]
+        current = year.active
+        activity_rows.append({
+            "year_id": year.id,
+            "title": f"Lomba {TOPICS[i % len(TOPICS)]} {i + 1}",
+            "description": f"Lomba {TOPICS[i % len(TOPICS)].lower()} tingkat SMA se-{CITIES[i % len(CITIES)]}.",
+            "date": today + timedelta(days=rng.randint(7, 60)) if current else date(int(year.name), rng.randint(1, 12), rng.randint(1, 28)),
+            "type": "competition" if i % 4 else "event",
+            "status": "open" if current else "closed",
+            "quota": None,
+        })
+    _insert(Activity, activity_rows)
+    activities = Activity.query.order_by(Activity.id).all()
+    echo(f"  {len(years)} years, {len(activities)} activities")
+
+    # A few large activities and a long tail, like real registration numbers
+    weights = [1 / (k + 1) for k in range(len(activities))]
+    rng.shuffle(weights)
+    cum_weights = list(itertools.accumulate(weights))
+    # Numbers for codes and e-mails continue after the existing rows, so --append never collides
+    offset = db.session.query(func.max(Registrant.id)).scalar() or 0
+    registrant_rows = []
+    for i in range(offset, offset + sizes["registrants"]):
+        activity = rng.choices(activities, cum_weights=cum_weights)[0]
+        created_at = datetime.combine(activity.date, datetime.min.time()) - timedelta(minutes=rng.randint(60, 60 * 24 * 45))
+        verified = rng.random() < 0.6
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        registrant_rows.append({
+            "activity_id": activity.id,
+            "name": f"{first} {last}",
+            "school": f"SMA Negeri {rng.randint(1, 40)} {rng.choice(CITIES)}",
+            "phone": f"08{rng.randint(10**9, 10**10 - 1)}",
+            "email": f"{first.lower()}.{last.lower()}{i}@sekolah.id",
+            "status": "verified" if verified else "pending",
+            "check_in_code": f"seed{i:012d}",
+            "attended_at": created_at + timedelta(days=rng.randint(1, 40)) if verified and rng.random() < 0.5 else None,
+            "created_at": created_at,
+        })
+        if len(registrant_rows) == BATCH:
+            _insert(Registrant, registrant_rows)
+            registrant_rows = []
+    _insert(Registrant, registrant_rows)
+    reconcile_activity_counters()
+    rebuild_daily_stats()
+    echo(f"  {sizes['registrants']} registrants")
+
+    _insert(Gallery, [
+        {
+            "year_id": activity.year_id,
+            "activity_id": activity.id,
+            "file": f"seed{i:06d}.jpg",
+            "caption": f"Dokumentasi {activity.title}",
+            "is_featured": rng.random() < 0.1,
+        }
+        for i, activity in enumerate(rng.choice(activities) for _ in range(sizes["gallery"]))
+    ])
+
+    admin = User.query.order_by(User.id).first()
+    now = datetime.utcnow()
+    log_rows = []
+    for i in range(sizes["logs"]):
+        action, entity_type = rng.choice(LOG_ACTIONS)
+        log_rows.append({
+            "user_id": admin.id if admin else None,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": str(rng.randint(1, sizes["registrants"])),
+            "details": None,
+            "created_at": now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+        })
+    _insert(ActivityLog, log_rows)
+
+    _insert(ContactMessage, [
+        {"name": rng.choice(FIRST_NAMES), "email": f"tanya{i}@contoh.id", "message": f"Kapan pendaftaran {rng.choice(TOPICS).lower()} dibuka?"}
+        for i in range(sizes["messages"])
+    ])
+    echo(f"  {sizes['gallery']} gallery rows, {sizes['logs']} log entries, {sizes['messages']} messages")
+    echo(f"Seeded scale {scale} in {time.perf_counter() - started:.1f}s")
+    return dict(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="1k", type=str.lower, choices=sorted(SCALES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--append", action="store_true", help="seed even if registrants already exist")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        tmp = tempfile.mkdtemp(prefix="goslides-seed-")
+        args.database_url = f"sqlite:///{os.path.join(tmp, 'seed.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app import create_app
+    from app.models import Registrant
+
+    app = create_app()
+    with app.app_context():
+        if Registrant.query.first() is not None and not args.append:
+            print("This database already has registrants; use --append to add more.")
+            return 1
+        seed(args.scale, seed=args.seed)
+    print(f"DATABASE_URL={args.database_url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
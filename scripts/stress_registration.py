@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Stress test pendaftaran: banyak thread mendaftar ke satu lomba berkuota sekaligus.
+Memastikan kuota tidak pernah terlampaui dan melaporkan pendaftaran/detik.
+
+SQLite (basis data sementara):  python scripts/stress_registration.py
+Postgres:                        DATABASE_URL=postgresql://... python scripts/stress_registration.py
+Opsi: --threads 32 --attempts 2000 --quota 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Agar app bisa di-import dari root proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=2000, help="total registration attempts")
+    parser.add_argument("--quota", type=int, default=500)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        tmp = tempfile.mkdtemp(prefix="goslides-stress-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'stress.db')}"
+
+    from app import create_app
+    from app.models import db, Activity, Registrant
+    from app.services.year_service import create_year
+    from app.services.activity_service import create_activity
+    from app.services.registrant_service import create_registrant
+
+    app = create_app()
+    with app.app_context():
+        year = create_year(f"Stress {int(time.time())}")
+        activity = create_activity(year.id, "Stress test", "", None, "competition", "open", args.quota)
+        activity_id = activity.id
+
+    counter = iter(range(args.attempts))
+    counter_lock = threading.Lock()
+    accepted = []
+    errors = []
+
+    def worker():
+        with app.app_context():
+            while True:
+                with counter_lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                try:
+                    reg = create_registrant(activity_id, f"Peserta {i}", "Sekolah", "", f"p{i}@stress.local")
+                    if reg is not None:
+                        accepted.append(i)
+                except Exception as e:  # report, keep hammering
+                    db.session.rollback()
+                    errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        activity = db.session.get(Activity, activity_id)
+        rows = Registrant.query.filter_by(activity_id=activity_id).count()
+        dialect = db.engine.dialect.name
+        status, registered_count = activity.status, activity.registered_count
+        # Leave the shared database clean when pointed at Postgres
+        db.session.delete(activity.year)
+        db.session.commit()
+
+    print(f"Backend:          {dialect}")
+    print(f"Threads:          {args.threads}")
+    print(f"Attempts:         {args.attempts}")
+    print(f"Quota:            {args.quota}")
+    print(f"Accepted:         {len(accepted)}")
+    print(f"Rows inserted:    {rows}")
+    print(f"Counter:          {registered_count}")
+    print(f"Activity status:  {status}")
+    print(f"Errors:           {len(errors)}")
+    print(f"Elapsed:          {elapsed:.2f}s")
+    print(f"Throughput:       {args.attempts / elapsed:.1f} attempts/s, {len(accepted) / elapsed:.1f} registrations/s")
+    for e in errors[:5]:
+        print(f"  {e}")
+
+    if rows > args.quota or rows != registered_count:
+        print("FAIL: quota oversold or counter out of sync")
+        return 1
+    if rows == args.quota and status != "closed":
+        print("FAIL: full activity was not closed")
+        return 1
+    print("OK: no overselling")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())